@@ -19,6 +19,7 @@ from .adapter_utils import (
     ProcessCoreSinkServer,
     WebSocketLike,
     WebSocketAdapterOptions,
+    install_uvloop,
 )
 from .api import MessageClient, MessageServer
 from .codec import dumps_message, dumps_messages, loads_message, loads_messages
@@ -78,4 +79,5 @@ __all__ = [
     "WebSocketLike",
     "WebSocketAdapterOptions",
     "HttpAdapterOptions",
+    "install_uvloop",
 ]
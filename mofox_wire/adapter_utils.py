@@ -2,14 +2,21 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import contextvars
+import inspect
 import logging
 import multiprocessing as mp
-from concurrent.futures import ThreadPoolExecutor
+import queue as queue_mod
+import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import defaultdict
 from dataclasses import dataclass
 from typing import Any, AsyncIterator, Awaitable, Callable, Literal, Protocol
 from urllib.parse import urlparse
 
-import orjson
+from orjson import dumps as _orjson_dumps
+from orjson import loads as _orjson_loads
 from aiohttp import web as aiohttp_web
 from websockets.legacy import client as ws_client
 from websockets.legacy import server as ws_server
@@ -22,6 +29,38 @@ logger = logging.getLogger("mofox_wire.adapter")
 OutgoingHandler = Callable[[MessageEnvelope], Awaitable[None]]
 
 
+# 默认出站帧 {"type":"send","payload":...} 的固定前后缀，直接拼接字节而不构造外层 dict
+_SEND_FRAME_HEAD = b'{"type":"send","payload":'
+_SEND_FRAME_TAIL = b"}"
+
+
+def _encode_send_frame(envelope: MessageEnvelope) -> bytes:
+    return b"".join((_SEND_FRAME_HEAD, _orjson_dumps(envelope), _SEND_FRAME_TAIL))
+
+
+class _WireCache:
+    """单条 outgoing envelope 的默认线格式编码缓存，由同一次广播的所有处理程序共享。"""
+
+    __slots__ = ("envelope", "tasks", "_data")
+
+    def __init__(self, envelope: MessageEnvelope) -> None:
+        self.envelope = envelope
+        # 本次广播创建的处理程序任务；处理程序再派生的任务虽继承上下文，但不在其中，不复用缓存
+        self.tasks: set[asyncio.Task[Any]] = set()
+        self._data: bytes | None = None
+
+    def encode(self) -> bytes:
+        if self._data is None:
+            self._data = _encode_send_frame(self.envelope)
+        return self._data
+
+
+# push_outgoing 广播时设置；create_task 会复制当前上下文，各处理程序任务因此共享同一缓存
+_outgoing_wire_cache: contextvars.ContextVar[_WireCache | None] = contextvars.ContextVar(
+    "mofox_wire_outgoing_wire_cache", default=None
+)
+
+
 class CoreMessageSink(Protocol):
     async def send(self, message: MessageEnvelope) -> None: ...
 
@@ -35,7 +74,7 @@ class CoreSink(CoreMessageSink, Protocol):
     - push_outgoing: 核心 → 适配器（outgoing）
     """
 
-    def set_outgoing_handler(self, handler: OutgoingHandler | None) -> None: ...
+    def set_outgoing_handler(self, handler: OutgoingHandler | None, platform: str | None = None) -> None: ...
 
     def remove_outgoing_handler(self, handler: OutgoingHandler) -> None: ...
 
@@ -61,9 +100,14 @@ class WebSocketAdapterOptions:
     headers: dict[str, str] | None = None
     incoming_parser: Callable[[str | bytes], Any] | None = None
     outgoing_encoder: Callable[[MessageEnvelope], str | bytes] | None = None
+    # 将整批消息编码为单个 WebSocket 帧（需对端支持该格式），例如
+    # lambda envs: orjson.dumps([{"type": "send", "payload": e} for e in envs])；None 表示逐条发送
+    outgoing_batch_encoder: Callable[[list[MessageEnvelope]], str | bytes] | None = None
     mode: Literal["client", "server"] = "client"
     allowed_paths: list[str] | None = None  # server mode path filter
-    reconnect_interval: float = 5.0  # 重连间隔（秒）
+    reconnect_interval: float = 5.0  # 首次重连间隔（秒），之后按指数退避增长
+    backoff_cap: float = 60.0  # 重连间隔上限（秒）；设为 reconnect_interval 即为固定间隔
+    backoff_jitter: bool = True  # 是否为重连间隔加入 0.5~1.5 倍的随机抖动，避免多个适配器同时重连
     max_reconnect_attempts: int | None = None  # 最大重连次数，None 表示无限重连
     max_message_size: int | None = 32 * 1024 * 1024  # WebSocket 消息大小上限（字节），None 表示无限制
 
@@ -86,6 +130,11 @@ class AdapterBase:
     """
 
     platform: str = "unknown"
+    # on_platform_messages 中同时转换的最大消息数，None 表示不限制
+    max_batch_concurrency: int | None = 32
+    # 同步实现的 from_platform_message/_send_platform_message 是否放到线程池执行；
+    # 默认在事件循环内直接调用，与 MessageRuntime 的 blocking=False 约定一致
+    blocking_platform_calls: bool = False
 
     def __init__(self, core_sink: CoreSink, transport: AdapterTransportOptions = None):
         """
@@ -94,15 +143,26 @@ class AdapterBase:
             transport: 传入 WebSocketAdapterOptions / HttpAdapterOptions 即可自动管理监听逻辑。
         """
         self.core_sink = core_sink
+        # sink 是否支持批量发送在其生命周期内不变，构造时解析一次
+        send_many = getattr(core_sink, "send_many", None)
+        self._send_many_fn: Callable[[list[MessageEnvelope]], Awaitable[None]] | None = (
+            send_many if callable(send_many) else None
+        )
         self._transport_config = transport
+        # 子类可以用普通 def 实现平台转换/发送，构造时判定一次调用方式
+        self._parse_is_async = inspect.iscoroutinefunction(self.from_platform_message)
+        self._send_is_async = inspect.iscoroutinefunction(self._send_platform_message)
         self._ws: WebSocketLike | None = None
         self._ws_task: asyncio.Task | None = None
         self._ws_server = None
         self._http_runner: aiohttp_web.AppRunner | None = None
         self._http_site: aiohttp_web.BaseSite | None = None
+        self._http_shared: _SharedHttpSite | None = None
         self._closed = False  # 标记适配器是否已关闭
         self._reconnect_attempts = 0  # 当前重连尝试次数
         self._ws_handler_tasks: set[asyncio.Task] = set()
+        # WebSocket 连接建立时置位、断开时清除，供 wait_connected 等待
+        self._connected_event = asyncio.Event()
 
     async def start(self) -> None:
         """启动适配器的传输层监听（如果配置了传输选项）。"""
@@ -110,7 +170,12 @@ class AdapterBase:
         self._reconnect_attempts = 0
         if hasattr(self.core_sink, "set_outgoing_handler"):
             try:
-                self.core_sink.set_outgoing_handler(self._on_outgoing_from_core)
+                try:
+                    # 带上平台名，支持按平台索引的 sink 只向本适配器分发匹配的消息
+                    self.core_sink.set_outgoing_handler(self._on_outgoing_from_core, platform=self.platform)
+                except TypeError:
+                    # 兼容尚未支持 platform 参数的自定义 sink
+                    self.core_sink.set_outgoing_handler(self._on_outgoing_from_core)
             except Exception:
                 logger.exception("注册 outgoing 处理程序到核心接收器失败")
         if isinstance(self._transport_config, WebSocketAdapterOptions):
@@ -122,6 +187,9 @@ class AdapterBase:
     async def stop(self) -> None:
         """停止适配器的传输层监听（如果配置了传输选项）。"""
         self._closed = True  # 标记为已关闭，阻止重连
+        # 唤醒仍在 wait_connected 中等待的协程，它们会看到 _closed 并返回 False
+        self._connected_event.set()
+        self._connected_event.clear()
         remove = getattr(self.core_sink, "remove_outgoing_handler", None)
         if callable(remove):
             try:
@@ -153,6 +221,11 @@ class AdapterBase:
             self._ws_server.close()
             await self._ws_server.wait_closed()
             self._ws_server = None
+        if self._http_shared:
+            shared, self._http_shared = self._http_shared, None
+            self._http_site = None
+            assert isinstance(self._transport_config, HttpAdapterOptions)
+            await shared.release(self._transport_config.path)
         if self._http_site:
             await self._http_site.stop()
             self._http_site = None
@@ -180,19 +253,20 @@ class AdapterBase:
         """
         if not isinstance(self._transport_config, WebSocketAdapterOptions):
             return True  # HTTP 模式不需要等待
-        
-        start = asyncio.get_event_loop().time()
-        while not self._closed:
-            if self._ws is not None and not self._ws.closed:
-                return True
-            if asyncio.get_event_loop().time() - start > timeout:
-                return False
-            await asyncio.sleep(0.1)
-        return False
+        if self._closed:
+            return False
+        if self._ws is not None and not self._ws.closed:
+            return True
+
+        try:
+            await asyncio.wait_for(self._connected_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return not self._closed and self._ws is not None and not self._ws.closed
 
     async def on_platform_message(self, raw: Any) -> None:
         """处理平台下发的单条消息并交给核心。"""
-        envelope = await self.from_platform_message(raw)
+        envelope = await self._from_platform(raw)
         # 检查处理结果，如果是None或空字典则跳过发送到核心
         if envelope is None or (isinstance(envelope, dict) and not envelope):
             logger.debug("适配器处理结果为空，跳过发送到核心")
@@ -201,33 +275,83 @@ class AdapterBase:
 
     async def on_platform_messages(self, raw_messages: list[Any]) -> None:
         """批量推送入口，内部自动批量或逐条送入核心。"""
+        # 并发转换整批消息，from_platform_message 中的 I/O 可以相互重叠；gather 保持原有顺序
+        limit = self.max_batch_concurrency
+        if limit is None or len(raw_messages) <= limit:
+            converted = await asyncio.gather(*map(self._from_platform, raw_messages))
+        else:
+            semaphore = asyncio.Semaphore(limit)
+
+            async def convert(raw: Any) -> MessageEnvelope:
+                async with semaphore:
+                    return await self._from_platform(raw)
+
+            converted = await asyncio.gather(*map(convert, raw_messages))
         envelopes = []
-        for raw in raw_messages:
-            envelope = await self.from_platform_message(raw)
+        for envelope in converted:
             # 检查处理结果，如果是None或空字典则跳过
             if envelope is None or (isinstance(envelope, dict) and not envelope):
                 logger.debug("适配器处理结果为空，跳过发送到核心")
                 continue
             envelopes.append(envelope)
 
-        if envelopes:  # 只有在有有效消息时才发送
-            await _send_many(self.core_sink, envelopes)
+        if not envelopes:  # 只有在有有效消息时才发送
+            return
+        if self._send_many_fn is not None:
+            await self._send_many_fn(envelopes)
+        else:
+            await asyncio.gather(*map(self.core_sink.send, envelopes))
 
     async def send_to_platform(self, envelope: MessageEnvelope) -> None:
         """核心生成单条消息时调用，由子类或自动传输层发送。"""
-        await self._send_platform_message(envelope)
+        await self._to_platform(envelope)
 
     async def send_batch_to_platform(self, envelopes: list[MessageEnvelope]) -> None:
-        """默认串行发送整批消息，子类可根据平台特性重写。"""
-        for env in envelopes:
-            await self._send_platform_message(env)
+        """默认并发发送整批消息，子类可根据平台特性重写。"""
+        if not envelopes:
+            return
+        if len(envelopes) == 1:
+            await self._to_platform(envelopes[0])
+            return
+        if (
+            isinstance(self._transport_config, WebSocketAdapterOptions)
+            and type(self)._send_platform_message is AdapterBase._send_platform_message
+        ):
+            await self._send_batch_via_ws(envelopes)
+            return
+        await asyncio.gather(*map(self._to_platform, envelopes))
 
     async def _on_outgoing_from_core(self, envelope: MessageEnvelope) -> None:
         """核心生成 outgoing envelope 时的内部处理逻辑"""
-        platform = envelope.get("platform") or envelope.get("message_info", {}).get("platform")
+        platform = _extract_platform(envelope)
         if platform and platform != getattr(self, "platform", None):
             return
-        await self._send_platform_message(envelope)
+        await self._to_platform(envelope)
+
+    def _from_platform(self, raw: Any) -> Awaitable[MessageEnvelope]:
+        """调用 from_platform_message；async 实现直接返回其协程，其余情况见 _call_sync_platform。"""
+        if self._parse_is_async:
+            return self.from_platform_message(raw)
+        return self._call_sync_platform(self.from_platform_message, raw)
+
+    def _to_platform(self, envelope: MessageEnvelope) -> Awaitable[None]:
+        """调用 _send_platform_message；async 实现直接返回其协程，其余情况见 _call_sync_platform。"""
+        if self._send_is_async:
+            return self._send_platform_message(envelope)
+        return self._call_sync_platform(self._send_platform_message, envelope)
+
+    async def _call_sync_platform(self, func: Callable[[Any], Any], arg: Any) -> Any:
+        """调用非 async def 的平台方法：默认内联执行，blocking_platform_calls=True 时放到线程池。
+
+        被普通装饰器包装的 async 方法会返回可等待对象，此时继续等待其结果。
+        """
+        if self.blocking_platform_calls:
+            result = await asyncio.to_thread(func, arg)
+        else:
+            result = func(arg)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
 
     async def from_platform_message(self, raw: Any) -> MessageEnvelope:
         """子类必须实现：将平台原始结构转换为统一 MessageEnvelope。"""
@@ -257,6 +381,7 @@ class AdapterBase:
                     max_size=options.max_message_size,
                 )
                 self._reconnect_attempts = 0
+                self._connected_event.set()
                 logger.info("WebSocket connected to %s", options.url)
                 await self._ws_listen_loop(options)
             except asyncio.CancelledError:
@@ -270,18 +395,20 @@ class AdapterBase:
                     logger.error("WebSocket reconnect failed; reached max attempts %s", max_attempts)
                     break
                 attempt_info = f"{self._reconnect_attempts}/{max_attempts}" if max_attempts else f"{self._reconnect_attempts}"
+                delay = _reconnect_delay(options, self._reconnect_attempts)
                 logger.warning(
                     "WebSocket connection error: %s; retrying in %.1fs (attempt %s)",
                     e,
-                    options.reconnect_interval,
+                    delay,
                     attempt_info,
                 )
-                await asyncio.sleep(options.reconnect_interval)
+                await asyncio.sleep(delay)
             finally:
                 if self._ws and not self._ws.closed:
                     with contextlib.suppress(Exception):
                         await self._ws.close()
                 self._ws = None
+                self._connected_event.clear()
 
     async def _start_ws_server(self, options: WebSocketAdapterOptions) -> None:
         """Start WebSocket server when running in server mode."""
@@ -299,6 +426,7 @@ class AdapterBase:
                 return
 
             self._ws = ws
+            self._connected_event.set()
             logger.info("WebSocket server accepted connection on %s%s", options.url, ws.path)
             await self._ws_listen_loop(options)
 
@@ -312,24 +440,23 @@ class AdapterBase:
 
     async def _ws_listen_loop(self, options: WebSocketAdapterOptions) -> None:
         """WebSocket message listen loop."""
-        assert self._ws is not None
+        ws = self._ws
+        assert ws is not None
+        # 循环内每条消息都会用到，预先绑定为局部变量
         parser = options.incoming_parser or self._default_ws_parser
+        on_message = self.on_platform_message
+        create_task = asyncio.create_task
+        track = self._ws_handler_tasks.add
+        untrack = self._ws_handler_tasks.discard
         try:
-            async for raw in self._ws:
+            async for raw in ws:
                 if self._closed:
                     break
                 try:
-                    payload = parser(raw)
-                    task = asyncio.create_task(self.on_platform_message(payload))
-                    self._ws_handler_tasks.add(task)
-                    task.add_done_callback(self._ws_handler_tasks.discard)
-                    task.add_done_callback(
-                        lambda t: logger.exception(
-                            "Failed to handle WebSocket message", exc_info=t.exception()
-                        )
-                        if t.exception()
-                        else None
-                    )
+                    task = create_task(on_message(parser(raw)))
+                    track(task)
+                    task.add_done_callback(untrack)
+                    task.add_done_callback(_log_ws_handler_failure)
                 except Exception:
                     logger.exception("Failed to handle WebSocket message")
         except asyncio.CancelledError:
@@ -338,6 +465,7 @@ class AdapterBase:
             logger.exception("WebSocket listen loop error")
         finally:
             self._ws = None
+            self._connected_event.clear()
 
     async def _send_via_ws(self, envelope: MessageEnvelope) -> None:
         """通过 WebSocket 发送消息。"""
@@ -347,15 +475,57 @@ class AdapterBase:
         encoder = None
         if isinstance(self._transport_config, WebSocketAdapterOptions):
             encoder = self._transport_config.outgoing_encoder
-        data = encoder(envelope) if encoder else self._default_ws_encoder(envelope)
+        if encoder:
+            data = encoder(envelope)
+        else:
+            cache = _outgoing_wire_cache.get()
+            # 仅当 envelope 未被替换、发送路径与默认编码器均未被子类重写，且处于广播任务本身时复用缓存；
+            # 重写的 _send_platform_message 可能原地修改 envelope 后再调用本方法
+            if (
+                cache is not None
+                and cache.envelope is envelope
+                and type(self)._send_platform_message is AdapterBase._send_platform_message
+                and self._default_ws_encoder is AdapterBase._default_ws_encoder
+                and asyncio.current_task() in cache.tasks
+            ):
+                data = cache.encode()
+            else:
+                data = self._default_ws_encoder(envelope)
         try:
             await self._ws.send(data)
         except Exception as e:
             logger.warning(f"WebSocket 发送消息失败: {e}")
             raise
 
+    async def _send_batch_via_ws(self, envelopes: list[MessageEnvelope]) -> None:
+        """先编码整批消息，再一次性提交所有 WebSocket 写入，而不是逐条等待。"""
+        ws = self._ws
+        if ws is None or ws.closed:
+            logger.warning("WebSocket 未连接，消息发送失败")
+            raise RuntimeError("WebSocket transport is not active")
+        options = self._transport_config
+        assert isinstance(options, WebSocketAdapterOptions)
+        try:
+            if options.outgoing_batch_encoder is not None:
+                # 一次编码、一次写入
+                await ws.send(options.outgoing_batch_encoder(envelopes))
+                return
+            encoder = options.outgoing_encoder or self._default_ws_encoder
+            datas = [encoder(envelope) for envelope in envelopes]
+            await asyncio.gather(*map(ws.send, datas))
+        except Exception as e:
+            logger.warning(f"WebSocket 批量发送消息失败: {e}")
+            raise
+
     async def _start_http_transport(self, options: HttpAdapterOptions) -> None:
-        app = options.app or aiohttp_web.Application()
+        if options.app is None:
+            # 未指定自定义 app 时，同一 host/port 上的适配器共享一个监听站点，按路径分发
+            shared = _SharedHttpSite.for_address(options.host, options.port)
+            await shared.acquire(options.path, self._handle_http_request)
+            self._http_shared = shared
+            self._http_site = shared.site
+            return
+        app = options.app
         app.add_routes([aiohttp_web.post(options.path, self._handle_http_request)])
         self._http_runner = aiohttp_web.AppRunner(app)
         await self._http_runner.setup()
@@ -363,8 +533,9 @@ class AdapterBase:
         await self._http_site.start()
 
     async def _handle_http_request(self, request: aiohttp_web.Request) -> aiohttp_web.Response:
+        # read() 会执行 aiohttp 的 client_max_size 检查，超限时返回 413
         raw = await request.read()
-        data = orjson.loads(raw) if raw else {}
+        data = _orjson_loads(raw) if raw else {}
         if isinstance(data, list):
             await self.on_platform_messages(data)
         else:
@@ -373,14 +544,82 @@ class AdapterBase:
 
     @staticmethod
     def _default_ws_parser(raw: str | bytes) -> Any:
-        data = orjson.loads(raw)
+        data = _orjson_loads(raw)
         if isinstance(data, dict) and data.get("type") == "message" and "payload" in data:
             return data["payload"]
         return data
 
     @staticmethod
     def _default_ws_encoder(envelope: MessageEnvelope) -> bytes:
-        return orjson.dumps({"type": "send", "payload": envelope})
+        return _encode_send_frame(envelope)
+
+
+HttpRequestHandler = Callable[[aiohttp_web.Request], Awaitable[aiohttp_web.StreamResponse]]
+
+
+class _SharedHttpSite:
+    """
+    同一事件循环内、同一 (host, port) 上多个 HTTP 适配器共享的 aiohttp 站点。
+
+    只绑定一个 TCP 监听，请求按路径分发给各适配器；最后一个适配器释放后关闭。
+    """
+
+    _registry: dict[tuple[asyncio.AbstractEventLoop, str, int], _SharedHttpSite] = {}
+
+    def __init__(self, key: tuple[asyncio.AbstractEventLoop, str, int]) -> None:
+        self._key = key
+        self._handlers: dict[str, HttpRequestHandler] = {}
+        self._lock = asyncio.Lock()
+        self.runner: aiohttp_web.AppRunner | None = None
+        self.site: aiohttp_web.TCPSite | None = None
+
+    @classmethod
+    def for_address(cls, host: str, port: int) -> _SharedHttpSite:
+        key = (asyncio.get_running_loop(), host, port)
+        shared = cls._registry.get(key)
+        if shared is None:
+            shared = cls._registry[key] = cls(key)
+        return shared
+
+    async def acquire(self, path: str, handler: HttpRequestHandler) -> None:
+        _, host, port = self._key
+        if path in self._handlers:
+            raise ValueError(f"HTTP 路径 {path} 已被 {host}:{port} 上的其他适配器占用")
+        self._handlers[path] = handler
+        try:
+            async with self._lock:
+                if self.runner is None:
+                    app = aiohttp_web.Application()
+                    app.router.add_post("/{tail:.*}", self._dispatch)
+                    runner = aiohttp_web.AppRunner(app)
+                    await runner.setup()
+                    site = aiohttp_web.TCPSite(runner, host, port)
+                    try:
+                        await site.start()
+                    except BaseException:
+                        await runner.cleanup()
+                        raise
+                    self.runner, self.site = runner, site
+        except BaseException:
+            await self.release(path)
+            raise
+
+    async def release(self, path: str) -> None:
+        self._handlers.pop(path, None)
+        if self._handlers:
+            return
+        if self._registry.get(self._key) is self:
+            del self._registry[self._key]
+        async with self._lock:
+            if self.runner is not None:
+                runner, self.runner, self.site = self.runner, None, None
+                await runner.cleanup()
+
+    async def _dispatch(self, request: aiohttp_web.Request) -> aiohttp_web.StreamResponse:
+        handler = self._handlers.get(request.path)
+        if handler is None:
+            raise aiohttp_web.HTTPNotFound()
+        return await handler(request)
 
 
 class InProcessCoreSink(CoreSink):
@@ -390,7 +629,12 @@ class InProcessCoreSink(CoreSink):
 
     def __init__(self, handler: Callable[[MessageEnvelope], Awaitable[None]]):
         self._handler = handler
-        self._outgoing_handlers: set[OutgoingHandler] = set()
+        # handler -> 注册时声明的平台（None 表示接收所有平台）
+        self._outgoing_handlers: dict[OutgoingHandler, str | None] = {}
+        # 以下分发快照只在注册/移除时重建，push_outgoing 直接遍历，不再逐条分配列表
+        self._all_handlers: tuple[OutgoingHandler, ...] = ()
+        self._any_platform_handlers: tuple[OutgoingHandler, ...] = ()
+        self._by_platform: dict[str, tuple[OutgoingHandler, ...]] = {}
         self._tasks: set[asyncio.Task] = set()
 
     def _track_task(self, task: asyncio.Task, *, label: str) -> None:
@@ -402,13 +646,28 @@ class InProcessCoreSink(CoreSink):
             else None
         )
 
-    def set_outgoing_handler(self, handler: OutgoingHandler | None) -> None:
+    def set_outgoing_handler(self, handler: OutgoingHandler | None, platform: str | None = None) -> None:
         if handler is None:
             return
-        self._outgoing_handlers.add(handler)
+        # 重新注册时移到末尾，平台以最新一次为准
+        self._outgoing_handlers.pop(handler, None)
+        self._outgoing_handlers[handler] = platform
+        self._rebuild_outgoing_index()
 
     def remove_outgoing_handler(self, handler: OutgoingHandler) -> None:
-        self._outgoing_handlers.discard(handler)
+        if handler in self._outgoing_handlers:
+            del self._outgoing_handlers[handler]
+            self._rebuild_outgoing_index()
+
+    def _rebuild_outgoing_index(self) -> None:
+        grouped: dict[str | None, list[OutgoingHandler]] = defaultdict(list)
+        for handler, platform in self._outgoing_handlers.items():
+            grouped[platform].append(handler)
+        any_platform = tuple(grouped.pop(None, ()))
+        self._all_handlers = tuple(self._outgoing_handlers)
+        self._any_platform_handlers = any_platform
+        # 每个平台的快照已包含通用处理程序，分发时只需一次字典查找
+        self._by_platform = {platform: (*handlers, *any_platform) for platform, handlers in grouped.items()}
 
     async def send(self, message: MessageEnvelope) -> None:
         task = asyncio.create_task(self._handler(message))
@@ -420,12 +679,25 @@ class InProcessCoreSink(CoreSink):
             self._track_task(task, label="incoming-batch")
 
     async def push_outgoing(self, envelope: MessageEnvelope) -> None:
-        if not self._outgoing_handlers:
+        platform = _extract_platform(envelope)
+        if platform:
+            # 只分发给声明了该平台的处理程序，以及未声明平台的通用处理程序
+            callbacks = self._by_platform.get(platform, self._any_platform_handlers)
+        else:
+            callbacks = self._all_handlers
+        if not callbacks:
             logger.debug("Outgoing envelope dropped: no handler registered")
             return
-        for callback in list(self._outgoing_handlers):
-            task = asyncio.create_task(callback(envelope))
-            self._track_task(task, label="outgoing")
+        # 多个适配器订阅时默认编码只执行一次，由首个需要的处理程序惰性生成
+        cache = _WireCache(envelope)
+        token = _outgoing_wire_cache.set(cache)
+        try:
+            for callback in callbacks:
+                task = asyncio.create_task(callback(envelope))
+                cache.tasks.add(task)
+                self._track_task(task, label="outgoing")
+        finally:
+            _outgoing_wire_cache.reset(token)
 
     async def close(self) -> None:  # pragma: no cover - symmetry
         for task in list(self._tasks):
@@ -434,6 +706,85 @@ class InProcessCoreSink(CoreSink):
                 await task
         self._tasks.clear()
         self._outgoing_handlers.clear()
+        self._rebuild_outgoing_index()
+
+
+def _log_ws_handler_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.exception("Failed to handle WebSocket message", exc_info=task.exception())
+
+
+def _extract_platform(envelope: MessageEnvelope) -> str | None:
+    """读取 envelope 的目标平台：优先顶层 platform，其次 message_info.platform，不额外分配对象。"""
+    platform = envelope.get("platform")
+    if platform:
+        return platform
+    message_info = envelope.get("message_info")
+    return message_info.get("platform") if message_info else None
+
+
+def _reconnect_delay(options: WebSocketAdapterOptions, attempt: int) -> float:
+    """第 attempt 次（从 1 开始）重连前的等待时间：封顶的指数退避，可选随机抖动。"""
+    delay = min(options.backoff_cap, options.reconnect_interval * (2 ** min(attempt - 1, 16)))
+    if options.backoff_jitter:
+        delay *= random.uniform(0.5, 1.5)
+    return delay
+
+
+# 进程队列的停止信号；bytes 比较只需一次长度/内存比较，出队后与普通条目区分的开销最小
+_CONTROL_STOP = b"__mofox_wire_stop__"
+
+
+def _is_legacy_stop(item: Any) -> bool:
+    """旧版本使用的 dict 停止信号，只在条目未被识别时检查。"""
+    return isinstance(item, dict) and item.get("__core_sink_control__") == "stop"
+
+
+# 进程队列中 outgoing 条目的类型标记，条目格式为 (_OUTGOING_KIND, orjson bytes)
+_OUTGOING_KIND = b"outgoing"
+
+# 单次唤醒最多从进程队列取出的条目数
+_QUEUE_DRAIN_LIMIT = 64
+# 等待首条时的轮询间隔（秒），监听任务取消后工作线程最迟在该时间内退出
+_QUEUE_POLL_INTERVAL = 0.1
+
+
+def _drain_queue(q: mp.Queue, stop: threading.Event, limit: int = _QUEUE_DRAIN_LIMIT) -> list[Any]:
+    """轮询等待第一条（stop 置位后返回空列表），再非阻塞取出已就绪的后续条目，一次线程切换处理一批。"""
+    while True:
+        try:
+            items = [q.get(timeout=_QUEUE_POLL_INTERVAL)]
+            break
+        except queue_mod.Empty:
+            if stop.is_set():
+                return []
+    while len(items) < limit:
+        try:
+            items.append(q.get_nowait())
+        except queue_mod.Empty:
+            break
+    return items
+
+
+async def _drain_queue_async(executor: ThreadPoolExecutor, q: mp.Queue, stop: threading.Event) -> list[Any]:
+    """在专用线程中执行 _drain_queue；被取消时通知线程退出，并把线程已取出但未交付的条目放回队列。"""
+    future = executor.submit(_drain_queue, q, stop)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        stop.set()
+        future.add_done_callback(lambda f: _requeue_undelivered(q, f))
+        raise
+
+
+def _requeue_undelivered(q: mp.Queue, future: Future[list[Any]]) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    for item in future.result():
+        # 停止信号只针对被取消的监听者，不再转交给之后的消费者
+        if item == _CONTROL_STOP or _is_legacy_stop(item):
+            continue
+        q.put(item)
 
 
 class ProcessCoreSink(CoreSink):
@@ -441,7 +792,7 @@ class ProcessCoreSink(CoreSink):
     进程间核心消息 sink，实现 CoreSink 协议，使用 multiprocessing.Queue 初始化
     """
 
-    _CONTROL_STOP = {"__core_sink_control__": "stop"}
+    _CONTROL_STOP = _CONTROL_STOP
 
     def __init__(self, *, to_core_queue: mp.Queue, from_core_queue: mp.Queue) -> None:
         self._to_core_queue = to_core_queue
@@ -449,7 +800,6 @@ class ProcessCoreSink(CoreSink):
         self._outgoing_handler: OutgoingHandler | None = None
         self._closed = False
         self._listener_task: asyncio.Task | None = None
-        self._loop = asyncio.get_event_loop()
         self._handler_tasks: set[asyncio.Task] = set()
         # Dedicated executors: one for long-running queue.get, one for puts
         self._listener_executor = ThreadPoolExecutor(
@@ -470,10 +820,12 @@ class ProcessCoreSink(CoreSink):
             else None
         )
 
-    def set_outgoing_handler(self, handler: OutgoingHandler | None) -> None:
+    def set_outgoing_handler(self, handler: OutgoingHandler | None, platform: str | None = None) -> None:
+        # 进程间只有一个处理程序，平台过滤由适配器自身完成
         self._outgoing_handler = handler
         if handler is not None and (self._listener_task is None or self._listener_task.done()):
-            self._listener_task = self._loop.create_task(self._listen_from_core())
+            # 与 ProcessCoreSinkServer.start 一致，需在运行中的事件循环内调用
+            self._listener_task = asyncio.create_task(self._listen_from_core())
 
     def remove_outgoing_handler(self, handler: OutgoingHandler) -> None:
         if self._outgoing_handler is handler:
@@ -482,13 +834,17 @@ class ProcessCoreSink(CoreSink):
                 self._listener_task.cancel()
 
     async def send(self, message: MessageEnvelope) -> None:
-        await self._loop.run_in_executor(
+        await asyncio.get_running_loop().run_in_executor(
             self._io_executor, self._to_core_queue.put, {"kind": "incoming", "payload": message}
         )
 
     async def send_many(self, messages: list[MessageEnvelope]) -> None:
-        for message in messages:
-            await self.send(message)
+        # 整批作为一个队列项发送：只需一次线程切换、一次序列化和一次管道写入
+        if not messages:
+            return
+        await asyncio.get_running_loop().run_in_executor(
+            self._io_executor, self._to_core_queue.put, {"kind": "incoming_batch", "payload": list(messages)}
+        )
 
     async def push_outgoing(self, envelope: MessageEnvelope) -> None:
         logger.debug("ProcessCoreSink.push_outgoing 在子进程中调用; 被忽略")
@@ -514,20 +870,36 @@ class ProcessCoreSink(CoreSink):
         self._io_executor.shutdown(wait=False, cancel_futures=True)
 
     async def _listen_from_core(self) -> None:
+        stop = threading.Event()
         while not self._closed:
             try:
-                item = await self._loop.run_in_executor(self._listener_executor, self._from_core_queue.get)
+                items = await _drain_queue_async(self._listener_executor, self._from_core_queue, stop)
             except asyncio.CancelledError:
                 break
-            if item == self._CONTROL_STOP:
+            if not self._dispatch_from_core(items):
                 break
-            if isinstance(item, dict) and item.get("kind") == "outgoing":
+
+    def _dispatch_from_core(self, items: list[Any]) -> bool:
+        """分发一批来自核心的条目；遇到停止信号时返回 False。"""
+        for item in items:
+            if item == _CONTROL_STOP:
+                return False
+            if type(item) is tuple and len(item) == 2 and item[0] == _OUTGOING_KIND:
+                envelope = _orjson_loads(item[1])
+            elif isinstance(item, dict) and item.get("kind") == "outgoing":
+                # 兼容旧版本服务端发送的 dict 格式
                 envelope = item.get("payload")
-                if self._outgoing_handler:
-                    task = asyncio.create_task(self._outgoing_handler(envelope))
-                    self._track_task(task, label="process-core-outgoing")
+            elif _is_legacy_stop(item):
+                return False
             else:
                 logger.debug(f"ProcessCoreSink ���ܵ�δ֪����: {item}")
+                continue
+            if self._outgoing_handler:
+                task = asyncio.create_task(self._outgoing_handler(envelope))
+                self._track_task(task, label="process-core-outgoing")
+        return True
+
+
 class ProcessCoreSinkServer:
     """
     进程间核心消息 sink 服务器，实现 CoreSink 协议，使用 multiprocessing.Queue 初始化。
@@ -549,7 +921,6 @@ class ProcessCoreSinkServer:
         self._task: asyncio.Task | None = None
         self._closed = False
         self._name = name or "adapter"
-        self._loop = asyncio.get_event_loop()
         self._handler_tasks: set[asyncio.Task] = set()
         # Separate executors: incoming get should not block outgoing puts
         self._incoming_executor = ThreadPoolExecutor(
@@ -575,22 +946,44 @@ class ProcessCoreSinkServer:
             self._task = asyncio.create_task(self._consume_incoming())
 
     async def _consume_incoming(self) -> None:
+        stop = threading.Event()
         while not self._closed:
             try:
-                item = await self._loop.run_in_executor(self._incoming_executor, self._incoming_queue.get)
+                items = await _drain_queue_async(self._incoming_executor, self._incoming_queue, stop)
             except asyncio.CancelledError:
                 break
-            if isinstance(item, dict) and item.get("__core_sink_control__") == "stop":
+            if not self._dispatch_incoming(items):
                 break
+
+    def _dispatch_incoming(self, items: list[Any]) -> bool:
+        """分发一批来自适配器的条目；遇到停止信号时返回 False。"""
+        for item in items:
+            if item == _CONTROL_STOP:
+                return False
             if isinstance(item, dict) and item.get("kind") == "incoming":
                 envelope = item.get("payload")
                 task = asyncio.create_task(self._core_handler(envelope))
                 self._track_task(task, label=f"{self._name}-incoming")
+            elif isinstance(item, dict) and item.get("kind") == "incoming_batch":
+                for envelope in item.get("payload") or ():
+                    task = asyncio.create_task(self._core_handler(envelope))
+                    self._track_task(task, label=f"{self._name}-incoming-batch")
+            elif _is_legacy_stop(item):
+                return False
             else:
                 logger.debug(f"ProcessCoreSinkServer �������� {self._name} ��δ֪����: {item}")
+        return True
+
     async def push_outgoing(self, envelope: MessageEnvelope) -> None:
-        await self._loop.run_in_executor(
-            self._outgoing_executor, self._outgoing_queue.put, {"kind": "outgoing", "payload": envelope}
+        # 先用 orjson 序列化为 bytes，队列只需 pickle 一个 (bytes, bytes) 元组，远快于嵌套 dict
+        item: Any
+        try:
+            item = (_OUTGOING_KIND, _orjson_dumps(envelope))
+        except TypeError:
+            # 含 raw_bytes 等 JSON 无法表示的字段时退回旧版 dict 格式，由 pickle 传输
+            item = {"kind": "outgoing", "payload": envelope}
+        await asyncio.get_running_loop().run_in_executor(
+            self._outgoing_executor, self._outgoing_queue.put, item
         )
 
     async def close(self) -> None:
@@ -599,8 +992,8 @@ class ProcessCoreSinkServer:
         self._closed = True
         loop = asyncio.get_running_loop()
         # 使用默认线程池放入停止信号，避免与单线程执行器互相阻塞
-        await loop.run_in_executor(None, self._incoming_queue.put, {"__core_sink_control__": "stop"})
-        await loop.run_in_executor(None, self._outgoing_queue.put, ProcessCoreSink._CONTROL_STOP)
+        await loop.run_in_executor(None, self._incoming_queue.put, _CONTROL_STOP)
+        await loop.run_in_executor(None, self._outgoing_queue.put, _CONTROL_STOP)
         if self._task:
             self._task.cancel()
             with contextlib.suppress(asyncio.CancelledError):
@@ -614,13 +1007,21 @@ class ProcessCoreSinkServer:
         self._incoming_executor.shutdown(wait=False, cancel_futures=True)
         self._outgoing_executor.shutdown(wait=False, cancel_futures=True)
 
-async def _send_many(sink: CoreMessageSink, envelopes: list[MessageEnvelope]) -> None:
-    send_many = getattr(sink, "send_many", None)
-    if callable(send_many):
-        await send_many(envelopes)
-        return
-    for env in envelopes:
-        await sink.send(env)
+def install_uvloop() -> bool:
+    """
+    如果安装了可选依赖 uvloop，则将其设置为事件循环策略。
+
+    需要在创建事件循环（如 asyncio.run）之前调用。
+
+    Returns:
+        是否成功启用 uvloop
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
 
 
 __all__ = [
@@ -634,4 +1035,5 @@ __all__ = [
     "ProcessCoreSinkServer",
     "WebSocketLike",
     "WebSocketAdapterOptions",
+    "install_uvloop",
 ]
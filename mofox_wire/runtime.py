@@ -1,24 +1,41 @@
 from __future__ import annotations
 
 import asyncio
+import collections
+import contextvars
 import functools
 import inspect
+import logging
+import sys
 import threading
+import types
 import weakref
-from dataclasses import dataclass
-from typing import Awaitable, Callable, Dict, Iterable, List, Protocol
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Coroutine, Dict, Iterable, List, Protocol
 
 from .types import MessageEnvelope
 
+logger = logging.getLogger("mofox_wire.runtime")
+
 # 默认优先度
 DEFAULT_PRIORITY = 0
 
+# 可调用对象的调用方式标签，在注册时计算一次，分发时直接按标签调用
+_CALL_SYNC = 0
+_CALL_ASYNC = 1
+_CALL_THREAD = 2  # 同步且声明为阻塞，放到线程池执行
+
 Hook = Callable[[MessageEnvelope], Awaitable[None] | None]
 ErrorHook = Callable[[MessageEnvelope, BaseException], Awaitable[None] | None]
 Predicate = Callable[[MessageEnvelope], bool | Awaitable[bool]]
 MessageHandler = Callable[[MessageEnvelope], Awaitable[MessageEnvelope | None] | MessageEnvelope | None]
 BatchHandler = Callable[[List[MessageEnvelope]], Awaitable[List[MessageEnvelope] | None] | List[MessageEnvelope] | None]
 MiddlewareCallable = Callable[[MessageEnvelope], Awaitable[MessageEnvelope | None]]
+HookRunner = Callable[..., Awaitable[None]]
+# 编译后的匹配行：(优先度, 事件类型集合, 消息类型集合, 平台, 是否静态, predicate, predicate 调用方式, 路由)
+_MatchRow = tuple[int, frozenset[str] | None, frozenset[str] | None, str | None, bool, Predicate, int, "MessageRoute"]
+# (事件桶, 类型桶, 通用桶)
+_MatchPlan = tuple[Dict[str, tuple[_MatchRow, ...]], Dict[str, tuple[_MatchRow, ...]], tuple[_MatchRow, ...]]
 
 
 class Middleware(Protocol):
@@ -35,16 +52,43 @@ class MessageProcessingError(RuntimeError):
         self.original = original
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MessageRoute:
-    """消息路由配置，包含匹配条件和处理函数"""
+    """消息路由配置，包含匹配条件和处理函数，创建后不可修改"""
     predicate: Predicate
     handler: MessageHandler
     name: str | None = None
     message_type: str | None = None
-    message_types: set[str] | None = None  # 支持多个消息类型
-    event_types: set[str] | None = None
+    message_types: frozenset[str] | None = None  # 支持多个消息类型
+    event_types: frozenset[str] | None = None
     priority: int = DEFAULT_PRIORITY  # 优先度，数值越大优先级越高
+    platform: str | None = None  # 平台过滤条件
+    is_static: bool = False  # 仅依赖 类型/平台 条件，匹配时无需调用 predicate
+    blocking: bool = False  # 同步处理器是否放到线程池执行
+    predicate_kind: int = field(default=_CALL_SYNC, init=False, repr=False, compare=False)
+    handler_kind: int = field(default=_CALL_SYNC, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # 调用方式只在构造时计算一次，之后实例保持不可变
+        object.__setattr__(self, "predicate_kind", _classify_callable(self.predicate))
+        object.__setattr__(self, "handler_kind", _classify_callable(self.handler, blocking=self.blocking))
+
+
+@dataclass(slots=True)
+class MatchContext:
+    """单条消息的匹配上下文，每次分发只从信封中提取一次。
+
+    前置钩子执行完毕后提取，之后可通过 ``ctx_for(message)`` 在中间件、处理器和后置钩子中读取。
+    """
+    message: MessageEnvelope = field(repr=False)
+    seg_type: str | None
+    event_type: str | None
+    platform: str | None
+
+
+_current_match_context: contextvars.ContextVar[MatchContext | None] = contextvars.ContextVar(
+    "mofox_wire_match_context", default=None
+)
 
 
 class MessageRuntime:
@@ -55,13 +99,42 @@ class MessageRuntime:
     def __init__(self) -> None:
         self._routes: list[MessageRoute] = []
         self._before_hooks: list[Hook] = []
+        self._before_hook_kinds: list[int] = []
         self._after_hooks: list[Hook] = []
+        self._after_hook_kinds: list[int] = []
         self._error_hooks: list[ErrorHook] = []
+        self._error_hook_kinds: list[int] = []
+        # 钩子执行器在注册时按 0/1/多个 钩子预先构建，没有钩子时为 None
+        self._run_before_hooks: HookRunner | None = None
+        self._run_after_hooks: HookRunner | None = None
+        self._run_error_hooks: HookRunner | None = None
+        # fire_and_forget 后置钩子：消息入队后由常驻工作任务依次执行，不阻塞 handle_message
+        self._background_after_hooks: list[Hook] = []
+        self._background_after_hook_kinds: list[int] = []
+        self._run_background_after_hooks: HookRunner | None = None
+        self._after_hook_queue: asyncio.Queue[MessageEnvelope] | None = None
+        self._after_hook_worker: asyncio.Task[None] | None = None
         self._batch_handler: BatchHandler | None = None
+        self._batch_handler_kind = _CALL_SYNC
         self._lock = threading.RLock()
         self._middlewares: list[Middleware] = []
-        self._type_routes: Dict[str, list[MessageRoute]] = {}
-        self._event_routes: Dict[str, list[MessageRoute]] = {}
+        self._middleware_kinds: list[int] = []
+        # (中间件, 调用方式) 按由内到外的顺序预先排列，组合处理器链时直接顺序遍历
+        self._middlewares_reversed: tuple[tuple[Middleware, int], ...] = ()
+        # 路由 id -> (路由, 组合后的中间件处理器)；中间件或路由变更时整体替换为空表
+        self._compiled_chains: Dict[int, tuple[MessageRoute, MiddlewareCallable]] = {}
+        # 实例 id -> 该实例在本运行时注册的方法路由，供 unbind 清理
+        self._instance_routes: Dict[int, list[MessageRoute]] = {}
+        # 以下索引采用写时复制：写入方在锁内整体替换，读取方直接读取引用，无需加锁
+        self._type_routes: Dict[str, tuple[MessageRoute, ...]] = {}
+        # 未指定类型/事件的通用路由，按优先度排序，在 add_route 时预先计算
+        self._normal_routes: tuple[MessageRoute, ...] = ()
+        self._event_routes: Dict[str, tuple[MessageRoute, ...]] = {}
+        # 由 freeze() 从上述索引编译出的匹配计划，路由变更后置空，下次匹配时重新编译
+        self._match_plan: _MatchPlan | None = None
+        # 所有路由都是静态路由时，匹配结果只取决于 (消息类型, 事件类型, 平台)，可直接按键缓存
+        self._all_routes_static = True
+        self._static_resolver: Callable[[str | None, str | None, str | None], tuple[MessageRoute, ...]] | None = None
 
     def add_route(
         self,
@@ -69,9 +142,11 @@ class MessageRuntime:
         handler: MessageHandler,
         name: str | None = None,
         *,
-        message_type: str | list[str] | None = None,
+        message_type: str | list[str] | frozenset[str] | None = None,
         event_types: Iterable[str] | None = None,
         priority: int = DEFAULT_PRIORITY,
+        platform: str | None = None,
+        blocking: bool = False,
     ) -> None:
         """
         添加消息路由
@@ -80,49 +155,175 @@ class MessageRuntime:
             predicate: 路由匹配条件
             handler: 消息处理函数
             name: 路由名称（可选）
-            message_type: 消息类型，可以是字符串或字符串列表（可选）
+            message_type: 消息类型，可以是字符串、字符串列表或 frozenset（可选）
             event_types: 事件类型列表（可选）
             priority: 优先度，数值越大优先级越高。默认为 0。
                      消息只会被路由到最高优先度的处理器。
                      相同优先度的处理器会同时收到消息。
+            platform: 平台名称（可选），在调用 predicate 之前检查
+            blocking: 同步处理器是否放到线程池执行。默认 False，即在事件循环内直接调用。
         """
-        with self._lock:
-            # 处理 message_type 参数，支持字符串或列表
-            message_types_set: set[str] | None = None
-            single_message_type: str | None = None
-            
-            if message_type is not None:
-                if isinstance(message_type, str):
-                    message_types_set = {message_type}
-                    single_message_type = message_type
-                elif isinstance(message_type, list):
-                    message_types_set = set(message_type)
-                    if len(message_types_set) == 1:
-                        single_message_type = next(iter(message_types_set))
-                else:
-                    raise TypeError(f"message_type must be str or list[str], got {type(message_type)}")
-            
-            route = MessageRoute(
-                predicate=predicate,
-                handler=handler,
-                name=name,
-                message_type=single_message_type,
-                message_types=message_types_set,
-                event_types=set(event_types) if event_types is not None else None,
-                priority=priority,
+        self.add_routes_bulk(
+            (
+                _build_route(
+                    predicate,
+                    handler,
+                    name,
+                    message_type=message_type,
+                    event_types=event_types,
+                    priority=priority,
+                    platform=platform,
+                    blocking=blocking,
+                ),
             )
-            self._routes.append(route)
+        )
+
+    def add_routes_bulk(self, routes: Iterable[MessageRoute]) -> None:
+        """
+        批量添加消息路由，只获取一次锁并一次性重建全部索引
+
+        适合一次注册大量路由的场景（例如实例创建时注册其全部方法路由），
+        避免每条路由都重复加锁、排序和复制索引。
+
+        Args:
+            routes: 要添加的 MessageRoute 序列
+        """
+        new_routes = list(routes)
+        if not new_routes:
+            return
+        with self._lock:
+            self._routes.extend(new_routes)
+            self._all_routes_static = self._all_routes_static and all(r.is_static for r in new_routes)
             # 按优先度降序排序
             self._routes.sort(key=lambda r: r.priority, reverse=True)
-            
-            # 为每个消息类型建立索引
-            if message_types_set:
-                for msg_type in message_types_set:
-                    self._type_routes.setdefault(msg_type, []).append(route)
-            
-            if route.event_types:
-                for et in route.event_types:
-                    self._event_routes.setdefault(et, []).append(route)
+            self._normal_routes = tuple(
+                r for r in self._routes if r.message_types is None and r.event_types is None
+            )
+
+            # 为每个消息类型/事件类型建立索引，整批只复制一次
+            type_routes: Dict[str, tuple[MessageRoute, ...]] | None = None
+            event_routes: Dict[str, tuple[MessageRoute, ...]] | None = None
+            touched_types: set[str] = set()
+            touched_events: set[str] = set()
+            for route in new_routes:
+                if route.message_types:
+                    if type_routes is None:
+                        type_routes = dict(self._type_routes)
+                    for msg_type in route.message_types:
+                        type_routes[msg_type] = type_routes.get(msg_type, ()) + (route,)
+                    touched_types.update(route.message_types)
+                if route.event_types:
+                    if event_routes is None:
+                        event_routes = dict(self._event_routes)
+                    for et in route.event_types:
+                        event_routes[et] = event_routes.get(et, ()) + (route,)
+                    touched_events.update(route.event_types)
+            # 每个桶都按优先度降序排列，匹配时遇到更低优先度即可提前结束
+            if type_routes is not None:
+                for msg_type in touched_types:
+                    type_routes[msg_type] = _sorted_by_priority(type_routes[msg_type])
+                self._type_routes = type_routes
+            if event_routes is not None:
+                for et in touched_events:
+                    event_routes[et] = _sorted_by_priority(event_routes[et])
+                self._event_routes = event_routes
+            self._match_plan = None
+            self._static_resolver = None
+
+    def bind(self, instance: object) -> List[MessageRoute]:
+        """
+        显式注册实例上属于本运行时的方法路由
+
+        被装饰类的实例在 ``__init__`` 结束时会自动注册；对绕过 ``__init__`` 创建的实例，
+        或在 ``unbind`` 之后需要重新注册时调用。处理器在注册时即绑定为实例方法，分发时不再做描述符查找。
+        已注册过的方法不会重复注册。
+
+        Args:
+            instance: 类中含有 ``@runtime.on_message`` / ``@runtime.route`` 方法的实例
+
+        Returns:
+            本次新注册的路由列表
+        """
+        instance_id = id(instance)
+        routes = []
+        for descriptor in _instance_route_plan(type(instance)):
+            if descriptor._runtime is not self:
+                continue
+            descriptor._unbound_ids.discard(instance_id)
+            route = descriptor._claim_instance(instance)
+            if route is not None:
+                routes.append(route)
+        self._add_instance_routes(instance, routes)
+        return routes
+
+    def unbind(self, instance: object) -> int:
+        """
+        移除实例在本运行时注册的全部方法路由，并释放运行时对实例的引用
+
+        Args:
+            instance: 之前通过自动注册或 ``bind`` 注册过的实例
+
+        Returns:
+            被移除的路由数量
+        """
+        instance_id = id(instance)
+        with self._lock:
+            routes = self._instance_routes.pop(instance_id, None)
+            if not routes:
+                return 0
+            for descriptor in _instance_route_plan(type(instance)):
+                if descriptor._runtime is self:
+                    descriptor._registered_ids.discard(instance_id)
+                    if instance_id not in descriptor._unbound_ids:
+                        descriptor._unbound_ids.add(instance_id)
+                        weakref.finalize(instance, descriptor._unbound_ids.discard, instance_id)
+            removed = {id(route) for route in routes}
+            remaining = [route for route in self._routes if id(route) not in removed]
+            # 从剩余路由整体重建索引，读取方持有的旧快照不受影响
+            self._routes = []
+            self._type_routes = {}
+            self._event_routes = {}
+            self._normal_routes = ()
+            self._all_routes_static = True
+            self._compiled_chains = {}
+            self._match_plan = None
+            self._static_resolver = None
+            self.add_routes_bulk(remaining)
+        return len(routes)
+
+    def _add_instance_routes(self, instance: object, routes: List[MessageRoute]) -> None:
+        if not routes:
+            return
+        with self._lock:
+            self._instance_routes.setdefault(id(instance), []).extend(routes)
+            self.add_routes_bulk(routes)
+
+    def freeze(self) -> _MatchPlan:
+        """
+        将当前路由索引编译为匹配计划
+
+        每条路由展开为一个普通元组行，匹配时直接解包为局部变量，不再逐个读取路由属性。
+        通常无需手动调用：路由变更后的第一次匹配会自动重新编译；
+        也可在注册完成后主动调用，把编译开销挪到启动阶段。
+
+        Returns:
+            (事件桶, 类型桶, 通用桶) 形式的匹配计划
+        """
+        with self._lock:
+            plan = self._match_plan
+            if plan is None:
+                plan = (
+                    {key: _compile_rows(bucket) for key, bucket in self._event_routes.items()},
+                    {key: _compile_rows(bucket) for key, bucket in self._type_routes.items()},
+                    _compile_rows(self._normal_routes),
+                )
+                if self._all_routes_static:
+                    # 先发布解析器再发布计划，读取方看到新计划时解析器已就绪
+                    self._static_resolver = functools.lru_cache(maxsize=_STATIC_MATCH_CACHE_SIZE)(
+                        functools.partial(_resolve_static_routes, plan)
+                    )
+                self._match_plan = plan
+            return plan
 
     def route(
         self,
@@ -130,6 +331,7 @@ class MessageRuntime:
         name: str | None = None,
         *,
         priority: int = DEFAULT_PRIORITY,
+        blocking: bool = False,
     ) -> Callable[[MessageHandler], MessageHandler]:
         """装饰器写法，便于在核心逻辑中声明式注册。
         
@@ -139,6 +341,7 @@ class MessageRuntime:
             predicate: 路由匹配条件
             name: 路由名称（可选）
             priority: 优先度，数值越大优先级越高。默认为 0。
+            blocking: 同步处理器是否放到线程池执行。默认为 False。
         """
 
         def decorator(func: MessageHandler) -> MessageHandler:
@@ -151,9 +354,10 @@ class MessageRuntime:
                     name=name,
                     message_type=None,
                     priority=priority,
+                    blocking=blocking,
                 )
             
-            self.add_route(predicate, func, name=name, priority=priority)
+            self.add_route(predicate, func, name=name, priority=priority, blocking=blocking)
             return func
 
         return decorator
@@ -162,11 +366,12 @@ class MessageRuntime:
         self,
         func: MessageHandler | None = None,
         *,
-        message_type: str | list[str] | None = None,
+        message_type: str | list[str] | frozenset[str] | None = None,
         platform: str | None = None,
         predicate: Predicate | None = None,
         name: str | None = None,
         priority: int = DEFAULT_PRIORITY,
+        blocking: bool = False,
     ) -> Callable[[MessageHandler], MessageHandler] | MessageHandler:
         """Sugar decorator with optional Seg.type/platform predicate matching.
 
@@ -179,6 +384,7 @@ class MessageRuntime:
             priority: 优先度，数值越大优先级越高。默认为 0。
                      消息只会被路由到最高优先度的处理器。
                      相同优先度的处理器会同时收到消息。
+            blocking: 同步处理器是否放到线程池执行。默认为 False。
 
         Usages:
         - @runtime.on_message(...)
@@ -189,30 +395,9 @@ class MessageRuntime:
         If the target looks like an instance method (first arg is self), it will be
         auto-bound to the instance and registered when the object is constructed.
         """
-        # 将 message_type 转换为集合以便统一处理
-        message_types_set: set[str] | None = None
-        if message_type is not None:
-            if isinstance(message_type, str):
-                message_types_set = {message_type}
-            elif isinstance(message_type, list):
-                message_types_set = set(message_type)
-            else:
-                raise TypeError(f"message_type must be str or list[str], got {type(message_type)}")
-
-        async def combined_predicate(message: MessageEnvelope) -> bool:
-            if message_types_set is not None:
-                extracted_type = _extract_segment_type(message)
-                if extracted_type not in message_types_set:
-                    return False
-            if platform is not None:
-                info_platform = message.get("message_info", {}).get("platform")
-                if message.get("platform") not in (None, platform) and info_platform is None:
-                    return False
-                if info_platform not in (None, platform):
-                    return False
-            if predicate is None:
-                return True
-            return await _invoke_callable(predicate, message, prefer_thread=False)
+        _normalize_message_types(message_type)  # 尽早校验参数类型
+        # 类型与平台条件由 add_route 原生处理；没有自定义条件时路由可走静态匹配
+        route_predicate = predicate if predicate is not None else _always_true
 
         def decorator(func: MessageHandler) -> MessageHandler:
             # Support decorating instance methods: defer binding until the object is created.
@@ -220,13 +405,23 @@ class MessageRuntime:
                 return _InstanceMethodRoute(
                     runtime=self,
                     func=func,
-                    predicate=combined_predicate,
+                    predicate=route_predicate,
                     name=name,
                     message_type=message_type,
                     priority=priority,
+                    platform=platform,
+                    blocking=blocking,
                 )
 
-            self.add_route(combined_predicate, func, name=name, message_type=message_type, priority=priority)
+            self.add_route(
+                route_predicate,
+                func,
+                name=name,
+                message_type=message_type,
+                priority=priority,
+                platform=platform,
+                blocking=blocking,
+            )
             return func
 
         if func is not None:
@@ -235,62 +430,167 @@ class MessageRuntime:
 
 
 
-    def set_batch_handler(self, handler: BatchHandler) -> None:
+    def set_batch_handler(self, handler: BatchHandler, *, blocking: bool = False) -> None:
         self._batch_handler = handler
+        self._batch_handler_kind = _classify_callable(handler, blocking=blocking)
 
-    def register_before_hook(self, hook: Hook) -> None:
+    def register_before_hook(self, hook: Hook, *, blocking: bool = False) -> None:
+        """注册前置钩子；同步钩子默认内联执行，blocking=True 时放到线程池。"""
+        kind = _classify_callable(hook, blocking=blocking)
         self._before_hooks.append(hook)
+        self._before_hook_kinds.append(kind)
+        self._run_before_hooks = _compile_hook_runner(self._before_hooks, self._before_hook_kinds)
+
+    def register_after_hook(self, hook: Hook, *, blocking: bool = False, fire_and_forget: bool = False) -> None:
+        """
+        注册后置钩子
 
-    def register_after_hook(self, hook: Hook) -> None:
+        Args:
+            hook: 钩子函数
+            blocking: 同步钩子是否放到线程池执行
+            fire_and_forget: 仅产生副作用（如日志）的钩子可设为 True：消息放入队列后立即返回，
+                由常驻的后台任务依次执行，异常只记录日志。可用 ``flush_after_hooks`` 等待队列清空。
+        """
+        kind = _classify_callable(hook, blocking=blocking)
+        if fire_and_forget:
+            self._background_after_hooks.append(hook)
+            self._background_after_hook_kinds.append(kind)
+            self._run_background_after_hooks = _compile_hook_runner(
+                self._background_after_hooks, self._background_after_hook_kinds
+            )
+            return
         self._after_hooks.append(hook)
+        self._after_hook_kinds.append(kind)
+        self._run_after_hooks = _compile_hook_runner(self._after_hooks, self._after_hook_kinds)
 
-    def register_error_hook(self, hook: ErrorHook) -> None:
+    def register_error_hook(self, hook: ErrorHook, *, blocking: bool = False) -> None:
+        kind = _classify_callable(hook, blocking=blocking)
         self._error_hooks.append(hook)
+        self._error_hook_kinds.append(kind)
+        self._run_error_hooks = _compile_hook_runner(self._error_hooks, self._error_hook_kinds)
 
     def register_middleware(self, middleware: Middleware) -> None:
         """注册洋葱模型中间件，围绕处理器执行。"""
 
         self._middlewares.append(middleware)
+        self._middleware_kinds.append(_classify_callable(middleware))
+        self._middlewares_reversed = tuple(zip(reversed(self._middlewares), reversed(self._middleware_kinds)))
+        # 使已缓存的处理器链失效，下次分发时重新组合
+        self._compiled_chains = {}
 
     async def handle_message(self, message: MessageEnvelope) -> MessageEnvelope | None:
-        await self._run_hooks(self._before_hooks, message)
+        run_before = self._run_before_hooks
+        if run_before is not None:
+            await run_before(message)
+        # 每次分发都重新提取：信封可能已被前置钩子或外层处理器原地修改
+        ctx = _build_match_context(message)
+        token = _current_match_context.set(ctx)
         try:
-            routes = await self._match_routes_by_priority(message)
-            if not routes:
-                return None
+            try:
+                routes = await self._match_routes_by_priority(message, ctx)
+                if not routes:
+                    return None
             
-            # 并发执行所有最高优先度的处理器
-            if len(routes) == 1:
-                handler = self._wrap_with_middlewares(routes[0].handler)
-                result = await handler(message)
-            else:
-                # 多个相同优先度的处理器并发执行
-                tasks = []
-                for route in routes:
-                    handler = self._wrap_with_middlewares(route.handler)
-                    tasks.append(handler(message))
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                # 返回第一个非异常、非 None 的结果
-                result = None
-                for r in results:
-                    if isinstance(r, Exception):
-                        continue
-                    if r is not None:
-                        result = r
-                        break
-        except Exception as exc:
-            await self._run_error_hooks(message, exc)
-            raise MessageProcessingError(message, exc) from exc
-        await self._run_hooks(self._after_hooks, message)
-        return result
-
-    async def handle_batch(self, messages: Iterable[MessageEnvelope]) -> List[MessageEnvelope]:
-        batch = list(messages)
+                # 并发执行所有最高优先度的处理器
+                if len(routes) == 1:
+                    route = routes[0]
+                    if route.handler_kind == _CALL_SYNC and not self._middlewares:
+                        # 同步处理器直接调用，不为其创建协程
+                        result = route.handler(message)
+                        if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+                            result = await result
+                    else:
+                        result = await self._dispatch(route, message)
+                else:
+                    # 多个相同优先度的处理器并发执行
+                    results = await _gather_eagerly(
+                        [self._dispatch(route, message) for route in routes], return_exceptions=True
+                    )
+                    # 返回第一个非异常、非 None 的结果
+                    result = None
+                    for r in results:
+                        if isinstance(r, Exception):
+                            continue
+                        if r is not None:
+                            result = r
+                            break
+            except Exception as exc:
+                run_error = self._run_error_hooks
+                if run_error is not None:
+                    await run_error(message, exc)
+                raise MessageProcessingError(message, exc) from exc
+            run_after = self._run_after_hooks
+            if run_after is not None:
+                await run_after(message)
+            if self._run_background_after_hooks is not None:
+                self._enqueue_background_after_hooks(message)
+            return result
+        finally:
+            _current_match_context.reset(token)
+
+    def _enqueue_background_after_hooks(self, message: MessageEnvelope) -> None:
+        """把消息交给常驻工作任务；工作任务不存在或属于其他事件循环时重新创建。"""
+        worker = self._after_hook_worker
+        queue = self._after_hook_queue
+        if worker is None or worker.done() or queue is None or worker.get_loop() is not asyncio.get_running_loop():
+            queue = asyncio.Queue()
+            self._after_hook_queue = queue
+            self._after_hook_worker = asyncio.create_task(
+                self._background_after_hook_loop(queue), name="mofox_wire_after_hooks"
+            )
+        queue.put_nowait(message)
+
+    async def _background_after_hook_loop(self, queue: asyncio.Queue[MessageEnvelope]) -> None:
+        while True:
+            message = await queue.get()
+            try:
+                run = self._run_background_after_hooks
+                if run is not None:
+                    await run(message)
+            except Exception:
+                logger.exception("后台后置钩子执行失败")
+            finally:
+                queue.task_done()
+
+    async def flush_after_hooks(self) -> None:
+        """等待已入队的 fire_and_forget 后置钩子全部执行完毕。"""
+        queue = self._after_hook_queue
+        worker = self._after_hook_worker
+        if queue is not None and worker is not None and not worker.done():
+            await queue.join()
+
+    async def close(self) -> None:
+        """执行完剩余的后台后置钩子并停止常驻工作任务。"""
+        await self.flush_after_hooks()
+        worker = self._after_hook_worker
+        self._after_hook_worker = None
+        self._after_hook_queue = None
+        if worker is not None and not worker.done():
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+
+    async def handle_batch(
+        self, messages: Iterable[MessageEnvelope], *, concurrent: bool = True
+    ) -> List[MessageEnvelope]:
+        """批量处理消息
+
+        未设置批量处理器时默认并发处理各条消息，响应顺序与输入顺序一致；
+        ``concurrent=False`` 时逐条顺序处理。
+        """
+        # 调用方通常已传入列表，直接复用以避免整批复制
+        batch = messages if isinstance(messages, list) else list(messages)
         if not batch:
             return []
         if self._batch_handler is not None:
-            result = await _invoke_callable(self._batch_handler, batch, prefer_thread=True)
+            result = await _invoke_kind(self._batch_handler_kind, self._batch_handler, batch)
             return result or []
+        if concurrent and len(batch) > 1:
+            handle = self.handle_message
+            results = await _gather_eagerly([handle(message) for message in batch])
+            return [response for response in results if response is not None]
         responses: list[MessageEnvelope] = []
         for message in batch:
             response = await self.handle_message(message)
@@ -298,127 +598,410 @@ class MessageRuntime:
                 responses.append(response)
         return responses
 
-    async def _match_routes_by_priority(self, message: MessageEnvelope) -> List[MessageRoute]:
+    async def _match_routes_by_priority(
+        self, message: MessageEnvelope, ctx: MatchContext | None = None
+    ) -> List[MessageRoute]:
         """匹配消息路由，返回所有最高优先度的匹配路由
         
         消息只会被路由到最高优先度的处理器。
         相同优先度的处理器会同时收到消息。
         """
-        message_type = _extract_segment_type(message)
-        event_type = (
-            message.get("event_type")
-            or message.get("message_info", {})
-            .get("additional_config", {})
-            .get("event_type")
-        )
+        if ctx is None:
+            ctx = _build_match_context(message)
+        message_type = ctx.seg_type
+        event_type = ctx.event_type
+        platform = ctx.platform
         
-        # 收集所有匹配的路由
+        # 读取编译好的匹配计划快照，注册期间的并发写入不会影响本次匹配
+        plan = self._match_plan
+        if plan is None:
+            plan = self.freeze()
+        resolver = self._static_resolver
+        if resolver is not None:
+            return list(resolver(message_type, event_type, platform))
+
+        # 收集最高优先度的匹配路由
         matched_routes: List[MessageRoute] = []
-        
-        with self._lock:
-            # 事件路由
-            if event_type and event_type in self._event_routes:
-                for route in self._event_routes[event_type]:
-                    should_handle = await _invoke_callable(route.predicate, message, prefer_thread=False)
-                    if should_handle:
-                        matched_routes.append(route)
-            
-            # 消息类型路由
-            if message_type and message_type in self._type_routes:
-                for route in self._type_routes[message_type]:
-                    if route not in matched_routes:
-                        should_handle = await _invoke_callable(route.predicate, message, prefer_thread=False)
-                        if should_handle:
-                            matched_routes.append(route)
-            
-            # 通用路由（没有明确指定类型的）
-            for route in self._routes:
-                if route.message_types is None and route.event_types is None:
-                    if route not in matched_routes:
-                        should_handle = await _invoke_callable(route.predicate, message, prefer_thread=False)
-                        if should_handle:
-                            matched_routes.append(route)
-        
-        if not matched_routes:
-            return []
-        
-        # 找出最高优先度
-        highest_priority = max(r.priority for r in matched_routes)
-        
-        # 返回所有最高优先度的路由
-        return [r for r in matched_routes if r.priority == highest_priority]
+        best_priority: int | None = None
+        event_rows, type_rows, normal_rows = plan
+        # (路由桶, 是否跳过声明了事件类型的路由)
+        buckets: list[tuple[tuple[_MatchRow, ...], bool]] = []
+        # 事件路由
+        if event_type and event_type in event_rows:
+            buckets.append((event_rows[event_type], False))
+        # 消息类型路由
+        # 声明了事件类型的路由须同时满足事件条件，只在事件桶中评估
+        if message_type and message_type in type_rows:
+            buckets.append((type_rows[message_type], True))
+        # 通用路由（没有明确指定类型的）
+        buckets.append((normal_rows, False))
+
+        for rows, skip_event_routes in buckets:
+            for priority, route_events, route_types, route_platform, is_static, predicate, predicate_kind, route in rows:
+                # 桶内按优先度降序排列，之后的路由都不可能胜出，无需再评估
+                if best_priority is not None and priority < best_priority:
+                    break
+                # 类型桶中声明了事件类型的路由：事件匹配时已在事件桶中评估过，不匹配时不应命中
+                if skip_event_routes and route_events is not None:
+                    continue
+                # 消息未携带平台信息时不做平台过滤
+                if route_platform is not None and platform is not None and route_platform != platform:
+                    continue
+                # 事件桶中的路由不保证消息类型，先做集合查找再决定是否调用 predicate
+                if route_types is not None and message_type not in route_types:
+                    continue
+                if is_static:
+                    # 类型与平台均已检查，无需调用 predicate
+                    pass
+                elif predicate_kind == _CALL_ASYNC:
+                    if not await predicate(message):
+                        continue
+                else:
+                    # 同步 predicate 直接调用，不创建协程
+                    should_handle = predicate(message)
+                    if asyncio.iscoroutine(should_handle) or isinstance(should_handle, asyncio.Future):
+                        should_handle = await should_handle
+                    if not should_handle:
+                        continue
+                if best_priority is None or priority > best_priority:
+                    best_priority = priority
+                    matched_routes = [route]
+                else:
+                    matched_routes.append(route)
+
+        return matched_routes
 
     async def _match_route(self, message: MessageEnvelope) -> MessageRoute | None:
         """匹配消息路由，返回第一个最高优先度的匹配路由（兼容旧接口）"""
         routes = await self._match_routes_by_priority(message)
         return routes[0] if routes else None
 
-    async def _run_hooks(self, hooks: Iterable[Hook], message: MessageEnvelope) -> None:
-        coro_list = [self._call_hook(hook, message) for hook in hooks]
-        if coro_list:
-            await asyncio.gather(*coro_list)
+    def _dispatch(self, route: MessageRoute, message: MessageEnvelope) -> Awaitable[MessageEnvelope | None]:
+        """没有中间件时直接调用处理器，不经过任何包装。"""
+        if not self._middlewares:
+            return _invoke_kind(route.handler_kind, route.handler, message)
+        return self._compiled_handler(route)(message)
 
-    async def _call_hook(self, hook: Hook, message: MessageEnvelope) -> None:
-        await _invoke_callable(hook, message, prefer_thread=True)
+    def _compiled_handler(self, route: MessageRoute) -> MiddlewareCallable:
+        """返回路由的中间件组合处理器，仅在中间件变更后重新构建。"""
+        # 缓存值同时持有路由本身，路由存活期间其 id 不会被复用；仍做一次身份校验以防万一
+        chains = self._compiled_chains
+        entry = chains.get(id(route))
+        if entry is None or entry[0] is not route:
+            entry = (route, self._wrap_with_middlewares(route.handler, route.handler_kind))
+            chains[id(route)] = entry
+        return entry[1]
 
-    async def _run_error_hooks(self, message: MessageEnvelope, exc: BaseException) -> None:
-        coros = [self._call_error_hook(hook, message, exc) for hook in self._error_hooks]
-        if coros:
-            await asyncio.gather(*coros)
+    def _wrap_with_middlewares(self, handler: MessageHandler, handler_kind: int) -> MiddlewareCallable:
+        # 异步处理器/中间件直接返回其协程，每层不再额外包一层协程帧
+        wrapped: MiddlewareCallable
+        if handler_kind == _CALL_ASYNC:
+            wrapped = handler  # type: ignore[assignment]
+        else:
+            wrapped = functools.partial(_invoke_kind, handler_kind, handler)
+        for middleware, kind in self._middlewares_reversed:
+            wrapped = _middleware_layer(middleware, kind, wrapped)
+        return wrapped
 
-    async def _call_error_hook(self, hook: ErrorHook, message: MessageEnvelope, exc: BaseException) -> None:
-        await _invoke_callable(hook, message, exc, prefer_thread=True)
 
-    def _wrap_with_middlewares(self, handler: MessageHandler) -> MiddlewareCallable:
-        async def base_handler(message: MessageEnvelope) -> MessageEnvelope | None:
-            return await _invoke_callable(handler, message, prefer_thread=True)
+def _compile_hook_runner(hooks: list[Callable[..., object]], kinds: list[int]) -> HookRunner | None:
+    """按钩子数量与类型构建执行器：同步钩子内联按序执行，单个钩子直接调用，多个异步钩子并发执行。"""
+    if not hooks:
+        return None
+    snapshot = tuple(zip(hooks, kinds))
+    if all(kind == _CALL_SYNC for _, kind in snapshot):
+        sync_hooks = tuple(hooks)
 
-        wrapped: MiddlewareCallable = base_handler
-        for middleware in reversed(self._middlewares):
-            current = wrapped
+        async def run_sync(*args) -> None:
+            for hook in sync_hooks:
+                result = hook(*args)
+                if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+                    await result
 
-            async def wrapper(msg: MessageEnvelope, mw=middleware, nxt=current) -> MessageEnvelope | None:
-                return await _invoke_callable(mw, msg, nxt, prefer_thread=False)
+        return run_sync
+    if len(snapshot) == 1:
+        hook, kind = snapshot[0]
+        if kind == _CALL_ASYNC:
+            return hook  # type: ignore[return-value]
+        return functools.partial(_invoke_kind, kind, hook)
 
-            wrapped = wrapper
-        return wrapped
+    async def run_many(*args) -> None:
+        await _gather_eagerly(
+            [hook(*args) if kind == _CALL_ASYNC else _invoke_kind(kind, hook, *args) for hook, kind in snapshot]
+        )
 
+    return run_many
 
-async def _invoke_callable(func: Callable[..., object], *args, prefer_thread: bool = False):
-    """支持 sync/async 调用，并可选择在线程中执行。
-    
-    自动处理普通函数、类方法和绑定方法。
+
+if sys.version_info >= (3, 12):
+
+    def _start_eager_task(coro: Coroutine[object, object, object]) -> asyncio.Task[object]:
+        # eager Task 在创建时同步执行到第一次挂起，不挂起就完成的协程不会进入事件循环调度；
+        # 执行期间 current_task() 指向新 Task 本身，asyncio.timeout/TaskGroup 等行为与普通 Task 一致
+        return asyncio.Task(coro, loop=asyncio.get_running_loop(), eager_start=True)
+
+else:
+    _start_eager_task = None  # type: ignore[assignment]
+
+
+def _gather_eagerly(
+    coros: list[Awaitable[object]], *, return_exceptions: bool = False
+) -> Awaitable[list[object]]:
+    """并发执行多个协程，结果顺序与传入顺序一致，语义同 ``asyncio.gather``。
+
+    Python 3.12+ 以 eager Task 启动各协程，省去不挂起协程的调度开销；3.11 直接使用 ``asyncio.gather``。
+    """
+    if _start_eager_task is None:
+        return asyncio.gather(*coros, return_exceptions=return_exceptions)
+    return asyncio.gather(
+        *[_start_eager_task(coro) if asyncio.iscoroutine(coro) else coro for coro in coros],
+        return_exceptions=return_exceptions,
+    )
+
+
+def _middleware_layer(middleware: Middleware, kind: int, nxt: MiddlewareCallable) -> MiddlewareCallable:
+    """构造洋葱模型中的一层：调用 middleware(message, nxt)。"""
+    if kind == _CALL_ASYNC:
+        def layer(message: MessageEnvelope) -> Awaitable[MessageEnvelope | None]:
+            return middleware(message, nxt)
+    else:
+        def layer(message: MessageEnvelope) -> Awaitable[MessageEnvelope | None]:
+            return _invoke_kind(kind, middleware, message, nxt)
+    return layer
+
+
+def _classify_callable(func: Callable[..., object], *, blocking: bool = False) -> int:
+    """在注册时判定调用方式，避免每次分发都做 inspect 探测。
+
+    绑定方法与普通函数调用方式相同，只需区分同步/异步；
+    对于定义了 ``async def __call__`` 的对象（如类形式的中间件）同样视为异步。
+    同步可调用对象仅在 ``blocking=True`` 时放到线程池执行。
     """
-    # 如果是绑定方法（bound method），直接使用，不需要额外处理
-    # 因为绑定方法已经包含了 self 参数
-    if inspect.ismethod(func):
-        # 绑定方法可以直接调用，args 中不应包含 self
-        if inspect.iscoroutinefunction(func):
-            return await func(*args)
-        if prefer_thread:
-            result = await asyncio.to_thread(func, *args)
-            if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
-                return await result
-            return result
-        result = func(*args)
-        if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
-            return await result
-        return result
-    
-    # 对于普通函数（未绑定的），按原有逻辑处理
     if inspect.iscoroutinefunction(func):
+        return _CALL_ASYNC
+    if not inspect.isroutine(func) and inspect.iscoroutinefunction(getattr(func, "__call__", None)):
+        return _CALL_ASYNC
+    return _CALL_THREAD if blocking else _CALL_SYNC
+
+
+async def _invoke_kind(kind: int, func: Callable[..., object], *args):
+    """按注册时计算的标签调用 sync/async/阻塞 可调用对象。"""
+    if kind == _CALL_ASYNC:
         return await func(*args)
-    if prefer_thread:
+    if kind == _CALL_THREAD:
         result = await asyncio.to_thread(func, *args)
-        if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
-            return await result
-        return result
-    result = func(*args)
+    else:
+        result = func(*args)
     if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
         return await result
     return result
 
 
+async def _invoke_callable(func: Callable[..., object], *args, prefer_thread: bool = False):
+    """支持 sync/async 调用，并可选择在线程中执行。
+
+    自动处理普通函数、类方法和绑定方法；热路径请使用预先分类的 ``_invoke_kind``。
+    """
+    return await _invoke_kind(_classify_callable(func, blocking=prefer_thread), func, *args)
+
+
+# 全静态路由时 (消息类型, 事件类型, 平台) -> 匹配结果 的缓存容量
+_STATIC_MATCH_CACHE_SIZE = 1024
+
+# 单一消息类型的 frozenset 驻留表，相同类型的路由共享同一个集合对象
+_SINGLETON_FROZENSETS: dict[str, frozenset[str]] = {}
+# 多元素过滤集合（消息类型/事件类型）的驻留表，内容相同的集合共享同一个对象
+_FROZENSET_INTERN: dict[frozenset[str], frozenset[str]] = {}
+
+
+def _intern_frozenset(values: Iterable[str]) -> frozenset[str]:
+    """返回与 values 内容相同的驻留 frozenset。"""
+    fs = values if isinstance(values, frozenset) else frozenset(values)
+    if len(fs) == 1:
+        return _normalize_message_types(next(iter(fs)))  # type: ignore[return-value]
+    interned = _FROZENSET_INTERN.get(fs)
+    if interned is None:
+        interned = _FROZENSET_INTERN.setdefault(fs, fs)
+    return interned
+
+
+def _sorted_by_priority(routes: Iterable[MessageRoute]) -> tuple[MessageRoute, ...]:
+    """按优先度降序排列；排序稳定，同优先度保持注册顺序。"""
+    return tuple(sorted(routes, key=lambda r: r.priority, reverse=True))
+
+
+def _compile_rows(routes: Iterable[MessageRoute]) -> tuple[_MatchRow, ...]:
+    """把路由桶展开为匹配行元组，顺序保持不变。"""
+    return tuple(
+        (
+            route.priority,
+            route.event_types,
+            route.message_types,
+            route.platform,
+            route.is_static,
+            _direct_callable(route.predicate),
+            route.predicate_kind,
+            route,
+        )
+        for route in routes
+    )
+
+
+# 直接调用即可走 C 层快速路径的可调用类型，无需预取 __call__
+_DIRECT_CALL_TYPES = (
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    functools.partial,
+)
+
+
+def _direct_callable(func: Callable[..., object]) -> Callable[..., object]:
+    """可调用对象实例（如带 __call__ 的类实例）预先取出绑定的 __call__，省去每次调用时的类型查找。"""
+    if isinstance(func, _DIRECT_CALL_TYPES):
+        return func
+    call = getattr(type(func), "__call__", None)
+    if call is None:
+        return func
+    return call.__get__(func, type(func))
+
+
+def _resolve_static_routes(
+    plan: _MatchPlan, message_type: str | None, event_type: str | None, platform: str | None
+) -> tuple[MessageRoute, ...]:
+    """只含静态路由时的匹配：与 _match_routes_by_priority 规则一致，但无需调用 predicate，结果可按键缓存。"""
+    event_rows, type_rows, normal_rows = plan
+    buckets: list[tuple[tuple[_MatchRow, ...], bool]] = []
+    if event_type and event_type in event_rows:
+        buckets.append((event_rows[event_type], False))
+    if message_type and message_type in type_rows:
+        buckets.append((type_rows[message_type], True))
+    buckets.append((normal_rows, False))
+
+    matched: list[MessageRoute] = []
+    best_priority: int | None = None
+    for rows, skip_event_routes in buckets:
+        for priority, route_events, route_types, route_platform, _, _, _, route in rows:
+            if best_priority is not None and priority < best_priority:
+                break
+            if skip_event_routes and route_events is not None:
+                continue
+            if route_platform is not None and platform is not None and route_platform != platform:
+                continue
+            if route_types is not None and message_type not in route_types:
+                continue
+            if best_priority is None or priority > best_priority:
+                best_priority = priority
+                matched = [route]
+            else:
+                matched.append(route)
+    return tuple(matched)
+
+
+def _build_route(
+    predicate: Predicate,
+    handler: MessageHandler,
+    name: str | None = None,
+    *,
+    message_type: str | list[str] | frozenset[str] | None = None,
+    event_types: Iterable[str] | None = None,
+    priority: int = DEFAULT_PRIORITY,
+    platform: str | None = None,
+    blocking: bool = False,
+) -> MessageRoute:
+    """按 add_route 的参数规则构造 MessageRoute，不涉及锁与索引。"""
+    message_types_set = _normalize_message_types(message_type)
+    single_message_type: str | None = None
+    if message_types_set is not None and len(message_types_set) == 1:
+        single_message_type = next(iter(message_types_set))
+    return MessageRoute(
+        predicate=predicate,
+        handler=handler,
+        name=name,
+        message_type=single_message_type,
+        message_types=message_types_set,
+        event_types=_intern_frozenset(event_types) if event_types is not None else None,
+        priority=priority,
+        platform=platform,
+        is_static=predicate is _always_true,
+        blocking=blocking,
+    )
+
+
+def _normalize_message_types(message_type: str | list[str] | frozenset[str] | None) -> frozenset[str] | None:
+    if message_type is None:
+        return None
+    if isinstance(message_type, str):
+        interned = _SINGLETON_FROZENSETS.get(message_type)
+        if interned is None:
+            interned = _SINGLETON_FROZENSETS.setdefault(message_type, frozenset((message_type,)))
+        return interned
+    if isinstance(message_type, (frozenset, list)):
+        return _intern_frozenset(message_type)
+    raise TypeError(f"message_type must be str or list[str], got {type(message_type)}")
+
+
+def _always_true(message: MessageEnvelope) -> bool:
+    """on_message 未提供自定义条件时使用的占位 predicate。"""
+    return True
+
+
+def _extract_platform(message: MessageEnvelope) -> str | None:
+    """message_info.platform 优先，其次顶层 platform。"""
+    info = message.get("message_info")
+    platform = info.get("platform") if info else None
+    if platform is None:
+        platform = message.get("platform")
+    return platform
+
+
+def copy_on_write(message: MessageEnvelope) -> collections.ChainMap:
+    """返回信封的写时复制视图，推荐在中间件中用它代替 ``dict(message)``。
+
+    读取直接落到原信封，写入只进入新的顶层字典，原信封保持不变，也不会复制整个信封。
+    视图不是 dict 实例，需要序列化或传给要求 dict 的接口时请先 ``dict(view)``。
+
+    Example:
+        async def tag(message, handler):
+            view = copy_on_write(message)
+            view["metadata"] = {"traced": True}
+            return await handler(view)
+    """
+    return collections.ChainMap({}, message)  # type: ignore[arg-type]
+
+
+def ctx_for(message: MessageEnvelope) -> MatchContext:
+    """返回消息的匹配上下文（只读）。
+
+    在 handle_message 期间对正在分发的信封调用时返回本次分发提取的结果，便于处理器读取；
+    消息被中间件替换或在分发之外调用时重新提取。路由匹配本身不复用该结果。
+    """
+    ctx = _current_match_context.get()
+    if ctx is not None and ctx.message is message:
+        return ctx
+    return _build_match_context(message)
+
+
+def _build_match_context(message: MessageEnvelope) -> MatchContext:
+    # 常见情况：message_segment 是非空字典，两次字典读取即可得到类型；其余形态交给完整的提取函数
+    seg = message.get("message_segment")
+    if type(seg) is dict and seg:
+        seg_type = seg.get("type")
+    else:
+        seg_type = _extract_segment_type(message)
+    return MatchContext(message, seg_type, _extract_event_type(message), _extract_platform(message))
+
+
+def _extract_event_type(message: MessageEnvelope) -> str | None:
+    """顶层 event_type 优先，其次 message_info.additional_config.event_type；缺失时不分配临时字典。"""
+    event_type = message.get("event_type")
+    if event_type:
+        return event_type
+    info = message.get("message_info")
+    config = info.get("additional_config") if info else None
+    return config.get("event_type") if config else None
+
+
 def _extract_segment_type(message: MessageEnvelope) -> str | None:
     seg = message.get("message_segment") or message.get("message_chain")
     if isinstance(seg, dict):
@@ -430,30 +1013,66 @@ def _extract_segment_type(message: MessageEnvelope) -> str | None:
     return None
 
 
+# 按函数对象缓存 _looks_like_method 的结果；弱引用键避免 id 复用导致误判
+_looks_like_method_cache: weakref.WeakKeyDictionary[Callable[..., object], bool] = weakref.WeakKeyDictionary()
+
+
 def _looks_like_method(func: Callable[..., object]) -> bool:
     """Return True if callable signature suggests an instance method (first arg named self)."""
     if inspect.ismethod(func):
         return True
     if not inspect.isfunction(func):
         return False
-    params = inspect.signature(func).parameters
-    if not params:
-        return False
-    first = next(iter(params.values()))
-    return first.name == "self"
+    cached = _looks_like_method_cache.get(func)
+    if cached is not None:
+        return cached
+    # Read the code object directly instead of building an inspect.Signature.
+    code = getattr(inspect.unwrap(func), "__code__", None)
+    result = bool(code is not None and code.co_argcount and code.co_varnames[0] == "self")
+    _looks_like_method_cache[func] = result
+    return result
+
+
+def _instance_route_plan(cls: type) -> tuple[_InstanceMethodRoute, ...]:
+    """按 MRO 汇总类上声明的实例方法路由，每个类只解析一次并缓存。"""
+    plan = cls.__dict__.get("_mofox_route_plan")
+    if plan is None:
+        plan = tuple(
+            descriptor
+            for klass in reversed(cls.__mro__)
+            for descriptor in klass.__dict__.get("_mofox_instance_routes", ())
+        )
+        setattr(cls, "_mofox_route_plan", plan)
+    return plan
 
 
 class _InstanceMethodRoute:
     """Descriptor that binds decorated instance methods and registers routes per-instance."""
 
+    __slots__ = (
+        "_runtime",
+        "_func",
+        "_predicate",
+        "_name",
+        "_message_type",
+        "_priority",
+        "_platform",
+        "_blocking",
+        "_owner",
+        "_registered_ids",
+        "_unbound_ids",
+    )
+
     def __init__(
         self,
         runtime: MessageRuntime,
         func: MessageHandler,
         predicate: Predicate,
         name: str | None,
-        message_type: str | None,
+        message_type: str | list[str] | frozenset[str] | None,
         priority: int = DEFAULT_PRIORITY,
+        platform: str | None = None,
+        blocking: bool = False,
     ) -> None:
         self._runtime = runtime
         self._func = func
@@ -461,55 +1080,94 @@ class _InstanceMethodRoute:
         self._name = name
         self._message_type = message_type
         self._priority = priority
+        self._platform = platform
+        self._blocking = blocking
         self._owner: type | None = None
-        self._registered_instances: weakref.WeakSet[object] = weakref.WeakSet()
+        # 以 id() 记录已注册的实例，成员判断不会触发实例自定义的 __hash__/__eq__
+        self._registered_ids: set[int] = set()
+        # 通过 unbind 显式解绑的实例，属性访问时不再惰性注册，直到再次 bind
+        self._unbound_ids: set[int] = set()
 
     def __set_name__(self, owner: type, name: str) -> None:
         self._owner = owner
-        registry: list[_InstanceMethodRoute] | None = getattr(owner, "_mofox_instance_routes", None)
+        registry: list[_InstanceMethodRoute] | None = owner.__dict__.get("_mofox_instance_routes")
         if registry is None:
             registry = []
             setattr(owner, "_mofox_instance_routes", registry)
             original_init = owner.__init__
+            # 父类的 __init__ 已经包装过时无需重复包装，其注册计划按实例的实际类型解析
+            if not getattr(original_init, "_mofox_registers_routes", False):
 
-            @functools.wraps(original_init)
-            def wrapped_init(inst, *args, **kwargs):
-                original_init(inst, *args, **kwargs)
-                for descriptor in getattr(inst.__class__, "_mofox_instance_routes", []):
-                    descriptor._register_instance(inst)
+                @functools.wraps(original_init)
+                def wrapped_init(inst, *args, **kwargs):
+                    original_init(inst, *args, **kwargs)
+                    _register_instance_routes(inst)
 
-            owner.__init__ = wrapped_init  # type: ignore[assignment]
+                wrapped_init._mofox_registers_routes = True  # type: ignore[attr-defined]
+                owner.__init__ = wrapped_init  # type: ignore[assignment]
         registry.append(self)
 
-    def _register_instance(self, instance: object) -> None:
-        if instance in self._registered_instances:
-            return
+    def _claim_instance(self, instance: object) -> MessageRoute | None:
+        """为尚未注册的实例构造路由并标记为已注册；已注册时返回 None。"""
+        instance_id = id(instance)
+        if instance_id in self._registered_ids:
+            return None
         owner = self._owner or instance.__class__
         bound = self._func.__get__(instance, owner)  # type: ignore[arg-type]
-        self._runtime.add_route(
+        route = _build_route(
             self._predicate,
             bound,
-            name=self._name,
+            self._name,
             message_type=self._message_type,
             priority=self._priority,
+            platform=self._platform,
+            blocking=self._blocking,
         )
-        self._registered_instances.add(instance)
+        self._registered_ids.add(instance_id)
+        # 实例被回收时移除其 id，避免之后复用同一 id 的新对象被误判为已注册
+        weakref.finalize(instance, self._registered_ids.discard, instance_id)
+        return route
+
+    def _register_instance(self, instance: object) -> None:
+        route = self._claim_instance(instance)
+        if route is not None:
+            self._runtime._add_instance_routes(instance, [route])
 
     def __get__(self, instance: object | None, owner: type | None = None):
         if instance is None:
             return self._func
-        self._register_instance(instance)
+        if id(instance) not in self._unbound_ids:
+            self._register_instance(instance)
         return self._func.__get__(instance, owner)  # type: ignore[arg-type]
 
 
+def _register_instance_routes(instance: object) -> None:
+    """实例构造完成后注册其全部方法路由，每个运行时只加锁一次。"""
+    pending: dict[int, tuple[MessageRuntime, list[MessageRoute]]] = {}
+    for descriptor in _instance_route_plan(type(instance)):
+        route = descriptor._claim_instance(instance)
+        if route is None:
+            continue
+        runtime = descriptor._runtime
+        entry = pending.get(id(runtime))
+        if entry is None:
+            entry = pending[id(runtime)] = (runtime, [])
+        entry[1].append(route)
+    for runtime, routes in pending.values():
+        runtime._add_instance_routes(instance, routes)
+
+
 __all__ = [
     "BatchHandler",
     "DEFAULT_PRIORITY",
     "Hook",
+    "MatchContext",
     "MessageHandler",
     "MessageProcessingError",
     "MessageRoute",
     "MessageRuntime",
     "Middleware",
     "Predicate",
+    "copy_on_write",
+    "ctx_for",
 ]
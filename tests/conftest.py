@@ -21,8 +21,12 @@ from mofox_wire.adapter_utils import InProcessCoreSink, ProcessCoreSink, Process
 
 @pytest.fixture(scope="session")
 def event_loop_policy():
-    """使用默认事件循环策略"""
-    return asyncio.DefaultEventLoopPolicy()
+    """安装了 uvloop 时使用 uvloop，否则使用默认事件循环策略"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
 
 
 @pytest.fixture
@@ -5,9 +5,15 @@ from __future__ import annotations
 
 import asyncio
 import multiprocessing as mp
+import sys
+import threading
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import aiohttp
+import orjson
 import pytest
+from websockets.legacy import server as ws_server
 
 from mofox_wire import MessageBuilder, MessageEnvelope
 from mofox_wire.adapter_utils import (
@@ -17,6 +23,10 @@ from mofox_wire.adapter_utils import (
     ProcessCoreSink,
     ProcessCoreSinkServer,
     WebSocketAdapterOptions,
+    _drain_queue,
+    _extract_platform,
+    _reconnect_delay,
+    install_uvloop,
 )
 
 
@@ -117,6 +127,121 @@ class TestInProcessCoreSink:
         # 不应抛出异常
         await sink.push_outgoing(msg)
 
+    @pytest.mark.asyncio
+    async def test_push_outgoing_by_platform(self, sink: InProcessCoreSink):
+        """测试按平台索引分发 outgoing 消息"""
+        qq_handler = AsyncMock()
+        discord_handler = AsyncMock()
+        any_handler = AsyncMock()
+        sink.set_outgoing_handler(qq_handler, platform="qq")
+        sink.set_outgoing_handler(discord_handler, platform="discord")
+        sink.set_outgoing_handler(any_handler)
+
+        qq_msg = make_message(platform="qq")
+        await sink.push_outgoing(qq_msg)
+
+        qq_handler.assert_called_once_with(qq_msg)
+        discord_handler.assert_not_called()
+        any_handler.assert_called_once_with(qq_msg)
+
+        # 未指定平台的消息分发给所有处理程序
+        no_platform_msg = make_message()
+        no_platform_msg["message_info"].pop("platform")
+        await sink.push_outgoing(no_platform_msg)
+        assert qq_handler.call_count == 2
+        assert discord_handler.call_count == 1
+
+        sink.remove_outgoing_handler(qq_handler)
+        await sink.push_outgoing(qq_msg)
+        assert qq_handler.call_count == 2
+        assert any_handler.call_count == 3
+
+        # 没有专属处理程序的平台只分发给通用处理程序
+        await sink.push_outgoing(make_message(platform="telegram"))
+        assert any_handler.call_count == 4
+        assert discord_handler.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_outgoing_dispatch_follows_registration_changes(self, sink: InProcessCoreSink):
+        """测试注册/移除处理器后分发目标随之更新"""
+        qq_handler = AsyncMock()
+        any_handler = AsyncMock()
+        sink.set_outgoing_handler(qq_handler, platform="qq")
+
+        await sink.push_outgoing(make_message(platform="qq"))
+        await asyncio.sleep(0)
+        assert qq_handler.call_count == 1
+
+        sink.set_outgoing_handler(any_handler)
+        await sink.push_outgoing(make_message(platform="qq"))
+        await asyncio.sleep(0)
+        assert qq_handler.call_count == 2
+        assert any_handler.call_count == 1
+
+        sink.remove_outgoing_handler(qq_handler)
+        sink.remove_outgoing_handler(any_handler)
+        await sink.push_outgoing(make_message(platform="qq"))
+        await sink.push_outgoing(make_message())
+        await asyncio.sleep(0)
+        assert qq_handler.call_count == 2
+        assert any_handler.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_push_outgoing_encodes_once(self, sink: InProcessCoreSink):
+        """测试多个 WebSocket 适配器共享同一份出站编码"""
+        sent: list[bytes] = []
+
+        class FakeWs:
+            closed = False
+
+            async def send(self, data):
+                sent.append(data)
+
+        adapters = []
+        for _ in range(3):
+            adapter = AdapterBase(sink, WebSocketAdapterOptions(url="ws://localhost:1/ws"))
+            adapter.platform = "test"
+            adapter._ws = FakeWs()  # type: ignore[assignment]
+            sink.set_outgoing_handler(adapter._on_outgoing_from_core)
+            adapters.append(adapter)
+
+        msg = make_message()
+        await sink.push_outgoing(msg)
+        await asyncio.gather(*sink._tasks)
+
+        assert len(sent) == 3
+        assert all(data is sent[0] for data in sent)
+        assert sent[0] == AdapterBase._default_ws_encoder(msg)
+
+    @pytest.mark.asyncio
+    async def test_push_outgoing_sends_in_place_changes(self, sink: InProcessCoreSink):
+        """测试子类原地修改 envelope 后发送时不使用广播时的旧编码"""
+        sent: list[bytes] = []
+
+        class FakeWs:
+            closed = False
+
+            async def send(self, data):
+                sent.append(data)
+
+        class RewritingAdapter(AdapterBase):
+            async def _send_platform_message(self, envelope):
+                envelope["message_segment"]["data"] = "rewritten"
+                await self._send_via_ws(envelope)
+
+        plain = AdapterBase(sink, WebSocketAdapterOptions(url="ws://localhost:1/ws"))
+        rewriting = RewritingAdapter(sink, WebSocketAdapterOptions(url="ws://localhost:1/ws"))
+        for adapter in (plain, rewriting):
+            adapter.platform = "test"
+            adapter._ws = FakeWs()  # type: ignore[assignment]
+            sink.set_outgoing_handler(adapter._on_outgoing_from_core)
+
+        await sink.push_outgoing(make_message(text="original"))
+        await asyncio.gather(*sink._tasks)
+
+        assert len(sent) == 2
+        assert any(b'"rewritten"' in data for data in sent)
+
     @pytest.mark.asyncio
     async def test_close(self, sink: InProcessCoreSink):
         """测试关闭清除处理器"""
@@ -152,6 +277,18 @@ class TestProcessCoreSink:
         except Exception:
             pass
 
+    def test_create_outside_event_loop(self, queues):
+        """测试可以在事件循环之外创建 sink"""
+        to_core, from_core = queues
+        sink = ProcessCoreSink(to_core_queue=to_core, from_core_queue=from_core)
+
+        async def roundtrip():
+            await sink.send(make_message())
+            await sink.close()
+
+        asyncio.run(roundtrip())
+        assert to_core.get(timeout=1)["kind"] == "incoming"
+
     @pytest.mark.asyncio
     async def test_send_message_to_queue(self, queues):
         """测试发送消息到队列"""
@@ -183,10 +320,11 @@ class TestProcessCoreSink:
         messages = [make_message(text=f"msg_{i}") for i in range(3)]
         await sink.send_many(messages)
         
-        # 检查队列中有 3 条消息
-        for i in range(3):
-            item = to_core.get(timeout=1)
-            assert item["kind"] == "incoming"
+        # 整批消息作为一个队列项发送
+        item = to_core.get(timeout=1)
+        assert item["kind"] == "incoming_batch"
+        assert [m["message_segment"]["data"] for m in item["payload"]] == ["msg_0", "msg_1", "msg_2"]
+        assert to_core.empty()
         
         await sink.close()
 
@@ -213,6 +351,95 @@ class TestProcessCoreSink:
         
         await sink.close()
 
+    @pytest.mark.asyncio
+    async def test_outgoing_handler_decodes_bytes(self, queues):
+        """测试 outgoing 处理器解码服务端序列化的条目"""
+        to_core, from_core = queues
+        sink = ProcessCoreSink(to_core_queue=to_core, from_core_queue=from_core)
+
+        received = []
+
+        async def handler(msg):
+            received.append(msg)
+
+        sink.set_outgoing_handler(handler)
+        outgoing_msg = make_message(text="outgoing")
+        from_core.put((b"outgoing", orjson.dumps(outgoing_msg)))
+        await asyncio.sleep(0.2)
+
+        assert received == [outgoing_msg]
+
+        await sink.close()
+
+    @pytest.mark.asyncio
+    async def test_outgoing_handler_drains_batch(self, queues):
+        """测试一次唤醒批量处理多条 outgoing 消息，并在停止信号处结束"""
+        to_core, from_core = queues
+        sink = ProcessCoreSink(to_core_queue=to_core, from_core_queue=from_core)
+
+        for i in range(3):
+            from_core.put({"kind": "outgoing", "payload": make_message(text=f"out_{i}")})
+        from_core.put(ProcessCoreSink._CONTROL_STOP)
+        from_core.put({"kind": "outgoing", "payload": make_message(text="after_stop")})
+        await asyncio.sleep(0.1)
+
+        received = []
+
+        async def handler(msg):
+            received.append(msg["message_segment"]["data"])
+
+        sink.set_outgoing_handler(handler)
+        await asyncio.sleep(0.2)
+
+        assert received == ["out_0", "out_1", "out_2"]
+
+        await sink.close()
+
+    def test_drain_queue_respects_limit(self, queues):
+        """测试批量取出不超过上限"""
+        to_core, _ = queues
+        for i in range(5):
+            to_core.put(i)
+        time.sleep(0.1)  # 等待 feeder 线程写入管道
+
+        stop = threading.Event()
+        assert _drain_queue(to_core, stop, limit=3) == [0, 1, 2]
+        assert _drain_queue(to_core, stop, limit=3) == [3, 4]
+
+    def test_drain_queue_returns_when_stopped(self, queues):
+        """测试停止后等待首条的线程会退出而不是一直阻塞"""
+        to_core, _ = queues
+        stop = threading.Event()
+        stop.set()
+
+        assert _drain_queue(to_core, stop) == []
+
+    @pytest.mark.asyncio
+    async def test_replaced_listener_does_not_lose_messages(self, queues):
+        """测试移除处理器后重新设置，被取消的监听线程不会吞掉之后的消息"""
+        to_core, from_core = queues
+        sink = ProcessCoreSink(to_core_queue=to_core, from_core_queue=from_core)
+        first = AsyncMock()
+        sink.set_outgoing_handler(first)
+        await asyncio.sleep(0.05)
+        sink.remove_outgoing_handler(first)
+        await asyncio.sleep(0)
+
+        received = []
+
+        async def second(msg):
+            received.append(msg["message_segment"]["data"])
+
+        sink.set_outgoing_handler(second)
+        for i in range(3):
+            from_core.put({"kind": "outgoing", "payload": make_message(text=f"out_{i}")})
+        await asyncio.sleep(0.5)
+
+        first.assert_not_called()
+        assert sorted(received) == ["out_0", "out_1", "out_2"]
+
+        await sink.close()
+
     @pytest.mark.asyncio
     async def test_close_sends_stop_signal(self, queues):
         """测试关闭发送停止信号"""
@@ -223,7 +450,7 @@ class TestProcessCoreSink:
         
         # 检查停止信号
         item = from_core.get(timeout=1)
-        assert item.get("__core_sink_control__") == "stop"
+        assert item == ProcessCoreSink._CONTROL_STOP
 
 
 # ============================================================
@@ -277,6 +504,30 @@ class TestProcessCoreSinkServer:
         
         await server.close()
 
+    @pytest.mark.asyncio
+    async def test_consume_incoming_batch(self, queues):
+        """测试消费批量 incoming 消息"""
+        incoming, outgoing = queues
+        received = []
+
+        async def handler(msg):
+            received.append(msg["message_segment"]["data"])
+
+        server = ProcessCoreSinkServer(
+            incoming_queue=incoming,
+            outgoing_queue=outgoing,
+            core_handler=handler,
+        )
+        server.start()
+
+        messages = [make_message(text=f"msg_{i}") for i in range(3)]
+        incoming.put({"kind": "incoming_batch", "payload": messages})
+        await asyncio.sleep(0.2)
+
+        assert received == ["msg_0", "msg_1", "msg_2"]
+
+        await server.close()
+
     @pytest.mark.asyncio
     async def test_push_outgoing(self, queues):
         """测试推送 outgoing 消息"""
@@ -291,11 +542,32 @@ class TestProcessCoreSinkServer:
         msg = make_message(text="outgoing")
         await server.push_outgoing(msg)
         
-        # 检查 outgoing 队列
+        # 检查 outgoing 队列：条目为 (类型标记, orjson 序列化后的 envelope)
+        kind, data = outgoing.get(timeout=1)
+        assert kind == b"outgoing"
+        assert orjson.loads(data)["message_segment"]["data"] == "outgoing"
+        
+        await server.close()
+
+    @pytest.mark.asyncio
+    async def test_push_outgoing_with_raw_bytes(self, queues):
+        """测试含 raw_bytes 的消息退回 dict 格式推送"""
+        incoming, outgoing = queues
+
+        server = ProcessCoreSinkServer(
+            incoming_queue=incoming,
+            outgoing_queue=outgoing,
+            core_handler=AsyncMock(),
+        )
+
+        msg = make_message(text="outgoing")
+        msg["raw_bytes"] = b"\x00\x01binary"
+        await server.push_outgoing(msg)
+
         item = outgoing.get(timeout=1)
         assert item["kind"] == "outgoing"
-        assert item["payload"]["message_segment"]["data"] == "outgoing"
-        
+        assert item["payload"]["raw_bytes"] == b"\x00\x01binary"
+
         await server.close()
 
     @pytest.mark.asyncio
@@ -317,6 +589,26 @@ class TestProcessCoreSinkServer:
         # 验证任务已取消
         assert server._task is None or server._task.done()
 
+    @pytest.mark.asyncio
+    async def test_legacy_stop_signal(self, queues):
+        """测试兼容旧版本的 dict 停止信号"""
+        incoming, outgoing = queues
+        handler = AsyncMock()
+        server = ProcessCoreSinkServer(
+            incoming_queue=incoming,
+            outgoing_queue=outgoing,
+            core_handler=handler,
+        )
+        server.start()
+
+        incoming.put({"__core_sink_control__": "stop"})
+        await asyncio.wait_for(server._task, timeout=1.0)
+
+        assert server._task.done()
+        handler.assert_not_called()
+
+        await server.close()
+
 
 # ============================================================
 # 测试 WebSocketAdapterOptions
@@ -360,6 +652,24 @@ class TestWebSocketAdapterOptions:
         assert options.incoming_parser is parser
         assert options.outgoing_encoder is encoder
 
+    def test_reconnect_backoff(self):
+        """测试重连间隔按指数增长并封顶"""
+        options = WebSocketAdapterOptions(
+            url="ws://localhost:8080",
+            reconnect_interval=1.0,
+            backoff_cap=5.0,
+            backoff_jitter=False,
+        )
+
+        assert [_reconnect_delay(options, n) for n in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+    def test_reconnect_backoff_jitter(self):
+        """测试抖动范围在 0.5~1.5 倍之间"""
+        options = WebSocketAdapterOptions(url="ws://localhost:8080", reconnect_interval=2.0)
+
+        for _ in range(50):
+            assert 1.0 <= _reconnect_delay(options, 1) <= 3.0
+
 
 # ============================================================
 # 测试 HttpAdapterOptions
@@ -437,7 +747,24 @@ class TestAdapterBase:
         
         await adapter.start()
         
-        mock_sink.set_outgoing_handler.assert_called_once()
+        mock_sink.set_outgoing_handler.assert_called_once_with(
+            adapter._on_outgoing_from_core, platform="unknown"
+        )
+
+    @pytest.mark.asyncio
+    async def test_start_with_legacy_sink(self, mock_sink):
+        """测试不支持 platform 参数的 sink 仍能注册 outgoing 处理器"""
+        registered = []
+
+        def set_outgoing_handler(handler):
+            registered.append(handler)
+
+        mock_sink.set_outgoing_handler = set_outgoing_handler
+        adapter = AdapterBase(core_sink=mock_sink)
+
+        await adapter.start()
+
+        assert registered == [adapter._on_outgoing_from_core]
 
     @pytest.mark.asyncio
     async def test_stop_removes_outgoing_handler(self, mock_sink):
@@ -453,6 +780,160 @@ class TestAdapterBase:
             any(call[0] == (None,) for call in mock_sink.set_outgoing_handler.call_args_list)
         )
 
+    def test_extract_platform(self):
+        """测试 platform 提取优先级"""
+        assert _extract_platform({"platform": "top", "message_info": {"platform": "info"}}) == "top"
+        assert _extract_platform({"message_info": {"platform": "info"}}) == "info"
+        assert _extract_platform({"message_info": {}}) is None
+        assert _extract_platform({}) is None
+
+    def test_default_ws_encoder_frame(self):
+        """测试默认编码器输出与直接序列化外层 dict 一致"""
+        msg = make_message(text="你好")
+        data = AdapterBase._default_ws_encoder(msg)
+
+        assert data == orjson.dumps({"type": "send", "payload": msg})
+        assert orjson.loads(data) == {"type": "send", "payload": msg}
+
+    @pytest.mark.asyncio
+    async def test_ws_batch_send_encodes_before_sending(self, mock_sink):
+        """测试 WebSocket 批量发送先编码整批，再按顺序提交写入"""
+        events = []
+
+        def encoder(envelope):
+            events.append(("encode", envelope["message_segment"]["data"]))
+            return envelope["message_segment"]["data"]
+
+        class FakeWs:
+            closed = False
+
+            async def send(self, data):
+                events.append(("send", data))
+
+        adapter = AdapterBase(
+            core_sink=mock_sink,
+            transport=WebSocketAdapterOptions(url="ws://localhost:1/ws", outgoing_encoder=encoder),
+        )
+        adapter._ws = FakeWs()  # type: ignore[assignment]
+        await adapter.send_batch_to_platform([make_message(text=t) for t in ("a", "b", "c")])
+
+        assert events == [
+            ("encode", "a"),
+            ("encode", "b"),
+            ("encode", "c"),
+            ("send", "a"),
+            ("send", "b"),
+            ("send", "c"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_ws_batch_send_single_frame(self, mock_sink):
+        """测试配置批量编码器时整批消息作为单帧发送"""
+        sent = []
+
+        class FakeWs:
+            closed = False
+
+            async def send(self, data):
+                sent.append(data)
+
+        def batch_encoder(envelopes):
+            return orjson.dumps([{"type": "send", "payload": e} for e in envelopes])
+
+        adapter = AdapterBase(
+            core_sink=mock_sink,
+            transport=WebSocketAdapterOptions(
+                url="ws://localhost:1/ws",
+                outgoing_batch_encoder=batch_encoder,
+            ),
+        )
+        adapter._ws = FakeWs()  # type: ignore[assignment]
+        messages = [make_message(text=t) for t in ("a", "b")]
+        await adapter.send_batch_to_platform(messages)
+
+        assert len(sent) == 1
+        assert orjson.loads(sent[0]) == [{"type": "send", "payload": m} for m in messages]
+
+    @pytest.mark.asyncio
+    async def test_ws_batch_send_empty_with_batch_encoder(self, mock_sink):
+        """测试配置批量编码器时空批量不发送任何帧"""
+        sent = []
+        batch_encoder = MagicMock(return_value=b"[]")
+
+        class FakeWs:
+            closed = False
+
+            async def send(self, data):
+                sent.append(data)
+
+        adapter = AdapterBase(
+            core_sink=mock_sink,
+            transport=WebSocketAdapterOptions(
+                url="ws://localhost:1/ws",
+                outgoing_batch_encoder=batch_encoder,
+            ),
+        )
+        adapter._ws = FakeWs()  # type: ignore[assignment]
+        await adapter.send_batch_to_platform([])
+
+        batch_encoder.assert_not_called()
+        assert sent == []
+
+    @pytest.mark.asyncio
+    async def test_ws_batch_send_not_connected(self, mock_sink):
+        """测试未连接时批量发送抛出异常"""
+        adapter = AdapterBase(
+            core_sink=mock_sink,
+            transport=WebSocketAdapterOptions(url="ws://localhost:1/ws"),
+        )
+
+        with pytest.raises(RuntimeError):
+            await adapter.send_batch_to_platform([make_message(), make_message()])
+
+    @pytest.mark.asyncio
+    async def test_batch_send_empty_list(self, mock_sink):
+        """测试空批量在未连接时也直接返回"""
+        adapter = AdapterBase(
+            core_sink=mock_sink,
+            transport=WebSocketAdapterOptions(url="ws://localhost:1/ws"),
+        )
+
+        await adapter.send_batch_to_platform([])
+
+    @pytest.mark.asyncio
+    async def test_wait_connected_wakes_on_connect(self, mock_sink, free_port: int):
+        """测试 wait_connected 在连接建立时立即返回"""
+        async def serve(ws):
+            await ws.wait_closed()
+
+        server = await ws_server.serve(serve, "127.0.0.1", free_port)
+        adapter = AdapterBase(
+            core_sink=mock_sink,
+            transport=WebSocketAdapterOptions(url=f"ws://127.0.0.1:{free_port}/ws"),
+        )
+        try:
+            await adapter.start()
+            assert await adapter.wait_connected(timeout=2.0) is True
+            assert adapter.is_connected()
+        finally:
+            await adapter.stop()
+            server.close()
+            await server.wait_closed()
+
+    @pytest.mark.asyncio
+    async def test_wait_connected_returns_false_on_stop(self, mock_sink, free_port: int):
+        """测试停止适配器会唤醒等待中的 wait_connected"""
+        adapter = AdapterBase(
+            core_sink=mock_sink,
+            transport=WebSocketAdapterOptions(url=f"ws://127.0.0.1:{free_port}/ws"),
+        )
+        await adapter.start()
+        waiter = asyncio.create_task(adapter.wait_connected(timeout=10.0))
+        await asyncio.sleep(0.05)
+        await adapter.stop()
+
+        assert await asyncio.wait_for(waiter, 1.0) is False
+
 
 # ============================================================
 # 测试自定义适配器
@@ -518,6 +999,272 @@ class TestCustomAdapter:
         # 检查 send_many 被调用
         assert mock_sink.send_many.called or mock_sink.send.call_count == 3
 
+    @pytest.mark.asyncio
+    async def test_sync_platform_methods_run_inline_by_default(self, mock_sink):
+        """测试同步实现的转换/发送方法默认在事件循环线程内直接执行"""
+        threads = []
+
+        class SyncAdapter(AdapterBase):
+            platform = "mock"
+
+            def from_platform_message(self, raw):
+                threads.append(threading.get_ident())
+                return make_message(platform="mock", text=raw["text"])
+
+            def _send_platform_message(self, envelope):
+                threads.append(threading.get_ident())
+
+        adapter = SyncAdapter(core_sink=mock_sink)
+        await adapter.on_platform_message({"text": "hi"})
+        await adapter.send_to_platform(make_message(platform="mock"))
+
+        assert mock_sink.send.call_args[0][0]["message_segment"]["data"] == "hi"
+        assert threads == [threading.get_ident()] * 2
+
+    @pytest.mark.asyncio
+    async def test_wrapped_async_platform_methods_are_awaited(self, mock_sink):
+        """测试被普通装饰器包装的 async 方法返回的协程会被等待"""
+        sent = []
+
+        def passthrough(fn):
+            def wrapper(*args):
+                return fn(*args)
+            return wrapper
+
+        class WrappedAdapter(AdapterBase):
+            platform = "mock"
+
+            @passthrough
+            async def from_platform_message(self, raw):
+                return make_message(platform="mock", text=raw["text"])
+
+            @passthrough
+            async def _send_platform_message(self, envelope):
+                sent.append(envelope)
+
+        adapter = WrappedAdapter(core_sink=mock_sink)
+        await adapter.on_platform_message({"text": "hi"})
+        outgoing = make_message(platform="mock")
+        await adapter.send_to_platform(outgoing)
+
+        assert mock_sink.send.call_args[0][0]["message_segment"]["data"] == "hi"
+        assert sent == [outgoing]
+
+    @pytest.mark.asyncio
+    async def test_sync_platform_methods_run_in_thread_when_blocking(self, mock_sink):
+        """测试 blocking_platform_calls=True 时同步实现的转换/发送方法在线程池中执行"""
+        threads = []
+
+        class SyncAdapter(AdapterBase):
+            platform = "mock"
+            blocking_platform_calls = True
+
+            def from_platform_message(self, raw):
+                threads.append(threading.get_ident())
+                return make_message(platform="mock", text=raw["text"])
+
+            def _send_platform_message(self, envelope):
+                threads.append(threading.get_ident())
+
+        adapter = SyncAdapter(core_sink=mock_sink)
+        await adapter.on_platform_message({"text": "hi"})
+        await adapter.on_platform_messages([{"text": "a"}, {"text": "b"}])
+        await adapter.send_to_platform(make_message(platform="mock"))
+
+        assert mock_sink.send.call_args[0][0]["message_segment"]["data"] == "hi"
+        assert len(mock_sink.send_many.call_args[0][0]) == 2
+        assert len(threads) == 4
+        assert threading.get_ident() not in threads
+
+    @pytest.mark.asyncio
+    async def test_batch_without_send_many(self):
+        """测试 sink 不支持 send_many 时逐条发送"""
+        class SendOnlySink:
+            def __init__(self):
+                self.sent = []
+
+            async def send(self, message):
+                self.sent.append(message)
+
+        sink = SendOnlySink()
+        adapter = self.MockAdapter(core_sink=sink)
+        await adapter.on_platform_messages([{"text": "a"}, {"text": "b"}])
+
+        assert [m["message_segment"]["data"] for m in sink.sent] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_batch_conversion_is_concurrent(self, mock_sink):
+        """测试批量转换并发执行且保持顺序"""
+        release = asyncio.Event()
+
+        class SlowAdapter(self.MockAdapter):
+            async def from_platform_message(self, raw):
+                if raw.get("text") == "slow":
+                    await release.wait()
+                else:
+                    release.set()
+                return await super().from_platform_message(raw)
+
+        adapter = SlowAdapter(core_sink=mock_sink)
+        await asyncio.wait_for(
+            adapter.on_platform_messages([{"text": "slow"}, {"text": "fast"}]),
+            timeout=1.0,
+        )
+
+        sent = mock_sink.send_many.call_args[0][0]
+        assert [m["message_segment"]["data"] for m in sent] == ["slow", "fast"]
+
+    @pytest.mark.asyncio
+    async def test_batch_conversion_concurrency_limit(self, mock_sink):
+        """测试批量转换的并发数不超过上限"""
+        active = 0
+        peak = 0
+
+        class CountingAdapter(self.MockAdapter):
+            max_batch_concurrency = 3
+
+            async def from_platform_message(self, raw):
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+                return await super().from_platform_message(raw)
+
+        adapter = CountingAdapter(core_sink=mock_sink)
+        await adapter.on_platform_messages([{"text": str(i)} for i in range(10)])
+
+        assert peak == 3
+        sent = mock_sink.send_many.call_args[0][0]
+        assert [m["message_segment"]["data"] for m in sent] == [str(i) for i in range(10)]
+
+    @pytest.mark.asyncio
+    async def test_ws_listen_loop_dispatches_messages(self, mock_sink, free_port: int):
+        """测试 WebSocket 监听循环解析并分发每条消息"""
+        async def serve(ws):
+            for text in ("first", "second"):
+                await ws.send(orjson.dumps({"type": "message", "payload": {"text": text}}))
+            await ws.wait_closed()
+
+        server = await ws_server.serve(serve, "127.0.0.1", free_port)
+        adapter = self.MockAdapter(
+            core_sink=mock_sink,
+            transport=WebSocketAdapterOptions(url=f"ws://127.0.0.1:{free_port}/ws"),
+        )
+        try:
+            await adapter.start()
+            for _ in range(50):
+                if mock_sink.send.call_count >= 2:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await adapter.stop()
+            server.close()
+            await server.wait_closed()
+
+        texts = [call[0][0]["message_segment"]["data"] for call in mock_sink.send.call_args_list]
+        assert sorted(texts) == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_http_transport_large_body(self, mock_sink, free_port: int):
+        """测试 HTTP 传输可以处理较大的批量请求体"""
+        adapter = self.MockAdapter(
+            core_sink=mock_sink,
+            transport=HttpAdapterOptions(host="127.0.0.1", port=free_port),
+        )
+        await adapter.start()
+        try:
+            url = f"http://127.0.0.1:{free_port}/adapter/messages"
+            batch = [{"text": "x" * 1024} for _ in range(100)]
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, json={"text": "small"}) as resp:
+                    assert resp.status == 200
+                async with session.post(url, json=batch) as resp:
+                    assert resp.status == 200
+        finally:
+            await adapter.stop()
+
+        assert mock_sink.send.call_args[0][0]["message_segment"]["data"] == "small"
+        assert len(mock_sink.send_many.call_args[0][0]) == 100
+
+    @pytest.mark.asyncio
+    async def test_http_transport_rejects_oversized_body(self, mock_sink, free_port: int):
+        """测试超过 aiohttp client_max_size 的请求体被拒绝并返回 413"""
+        adapter = self.MockAdapter(
+            core_sink=mock_sink,
+            transport=HttpAdapterOptions(host="127.0.0.1", port=free_port),
+        )
+        await adapter.start()
+        try:
+            url = f"http://127.0.0.1:{free_port}/adapter/messages"
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, data=b"x" * (1024 * 1024 + 1)) as resp:
+                    assert resp.status == 413
+        finally:
+            await adapter.stop()
+
+        mock_sink.send.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_http_adapters_share_port(self, free_port: int):
+        """测试同一端口上的多个 HTTP 适配器共享监听并按路径分发"""
+        sink_a, sink_b = MagicMock(send=AsyncMock()), MagicMock(send=AsyncMock())
+        adapter_a = self.MockAdapter(
+            core_sink=sink_a,
+            transport=HttpAdapterOptions(host="127.0.0.1", port=free_port, path="/a"),
+        )
+        adapter_b = self.MockAdapter(
+            core_sink=sink_b,
+            transport=HttpAdapterOptions(host="127.0.0.1", port=free_port, path="/b"),
+        )
+        base = f"http://127.0.0.1:{free_port}"
+        await adapter_a.start()
+        await adapter_b.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(f"{base}/a", json={"text": "to a"}) as resp:
+                    assert resp.status == 200
+                async with session.post(f"{base}/b", json={"text": "to b"}) as resp:
+                    assert resp.status == 200
+                async with session.post(f"{base}/c", json={"text": "nobody"}) as resp:
+                    assert resp.status == 404
+
+                # 停止一个适配器后，另一个仍可正常接收
+                await adapter_a.stop()
+                async with session.post(f"{base}/a", json={"text": "gone"}) as resp:
+                    assert resp.status == 404
+                async with session.post(f"{base}/b", json={"text": "still b"}) as resp:
+                    assert resp.status == 200
+        finally:
+            await adapter_a.stop()
+            await adapter_b.stop()
+
+        assert sink_a.send.call_count == 1
+        assert sink_b.send.call_count == 2
+
+        # 全部停止后端口被释放，可以重新绑定
+        adapter_c = self.MockAdapter(
+            core_sink=MagicMock(),
+            transport=HttpAdapterOptions(host="127.0.0.1", port=free_port, path="/a"),
+        )
+        await adapter_c.start()
+        await adapter_c.stop()
+
+    @pytest.mark.asyncio
+    async def test_http_adapters_duplicate_path(self, mock_sink, free_port: int):
+        """测试同一端口上重复的路径会被拒绝"""
+        options = HttpAdapterOptions(host="127.0.0.1", port=free_port, path="/dup")
+        first = self.MockAdapter(core_sink=mock_sink, transport=options)
+        second = self.MockAdapter(core_sink=mock_sink, transport=options)
+        await first.start()
+        try:
+            with pytest.raises(ValueError):
+                await second.start()
+            assert second.is_connected() is False
+        finally:
+            await second.stop()
+            await first.stop()
+
     @pytest.mark.asyncio
     async def test_custom_adapter_sends_to_platform(self, mock_sink):
         """测试自定义适配器发送到平台"""
@@ -539,6 +1286,28 @@ class TestCustomAdapter:
         
         assert len(adapter.sent_messages) == 3
 
+    @pytest.mark.asyncio
+    async def test_batch_send_is_concurrent(self, mock_sink):
+        """测试批量发送时慢消息不会阻塞其他消息"""
+        release = asyncio.Event()
+        sent = []
+
+        class SlowAdapter(self.MockAdapter):
+            async def _send_platform_message(self, envelope):
+                if envelope["message_segment"]["data"] == "slow":
+                    await release.wait()
+                sent.append(envelope["message_segment"]["data"])
+
+        adapter = SlowAdapter(core_sink=mock_sink)
+        messages = [make_message(text="slow"), make_message(text="fast")]
+        task = asyncio.create_task(adapter.send_batch_to_platform(messages))
+        await asyncio.sleep(0.01)
+
+        assert sent == ["fast"]
+        release.set()
+        await task
+        assert sent == ["fast", "slow"]
+
     @pytest.mark.asyncio
     async def test_outgoing_handler_filters_platform(self, mock_sink):
         """测试 outgoing 处理器按平台过滤"""
@@ -556,3 +1325,30 @@ class TestCustomAdapter:
         await adapter._on_outgoing_from_core(same_platform_msg)
         
         assert len(adapter.sent_messages) == 1
+
+
+# ============================================================
+# 测试 install_uvloop
+# ============================================================
+
+class TestInstallUvloop:
+    """测试可选的 uvloop 事件循环策略"""
+
+    def test_missing_uvloop(self, monkeypatch):
+        """测试未安装 uvloop 时保持原有策略"""
+        monkeypatch.setitem(sys.modules, "uvloop", None)
+        policy = asyncio.get_event_loop_policy()
+
+        assert install_uvloop() is False
+        assert asyncio.get_event_loop_policy() is policy
+
+    def test_installs_policy(self, monkeypatch):
+        """测试安装了 uvloop 时设置其事件循环策略"""
+        fake_uvloop = MagicMock()
+        fake_uvloop.EventLoopPolicy.return_value = asyncio.DefaultEventLoopPolicy()
+        monkeypatch.setitem(sys.modules, "uvloop", fake_uvloop)
+        set_policy = MagicMock()
+        monkeypatch.setattr(asyncio, "set_event_loop_policy", set_policy)
+
+        assert install_uvloop() is True
+        set_policy.assert_called_once_with(fake_uvloop.EventLoopPolicy.return_value)
@@ -262,7 +262,7 @@ class TestProcessCommunicationEdgeCases:
         
         # 验证停止信号被发送
         item = from_core.get(timeout=1)
-        assert item.get("__core_sink_control__") == "stop"
+        assert item == ProcessCoreSink._CONTROL_STOP
 
     @pytest.mark.asyncio
     async def test_double_close_is_safe(self, queues):
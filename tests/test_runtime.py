@@ -4,18 +4,27 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 from typing import List
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+import mofox_wire.runtime as runtime_module
 from mofox_wire import MessageBuilder, MessageEnvelope, MessageRuntime
 from mofox_wire.runtime import (
+    MatchContext,
     MessageProcessingError,
     MessageRoute,
     Middleware,
+    _CALL_ASYNC,
+    _CALL_SYNC,
+    _classify_callable,
+    _extract_event_type,
     _extract_segment_type,
     _looks_like_method,
+    copy_on_write,
+    ctx_for,
 )
 
 
@@ -99,6 +108,17 @@ class TestMessageRoute:
         assert route.predicate is predicate
         assert route.handler is handler
 
+    def test_route_uses_slots(self):
+        """测试路由对象使用 __slots__ 且不可修改"""
+        route = MessageRoute(predicate=lambda msg: True, handler=AsyncMock())
+
+        assert not hasattr(route, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            route.priority = 10  # type: ignore[misc]
+        # Python 3.11 的 frozen+slots 数据类对未知属性抛出 TypeError，3.12 起为 AttributeError
+        with pytest.raises((AttributeError, TypeError)):
+            route.unknown_attribute = 1  # type: ignore[attr-defined]
+
 
 # ============================================================
 # 测试 MessageRuntime 基本功能
@@ -180,6 +200,54 @@ class TestMessageRuntimeBasic:
         assert result == response_msg
         handler.assert_called_once_with(msg)
 
+    @pytest.mark.asyncio
+    async def test_add_routes_bulk(self, runtime: MessageRuntime):
+        """测试批量添加路由后索引与逐条添加一致"""
+        text_handler = AsyncMock(return_value=None)
+        event_handler = AsyncMock(return_value=None)
+        runtime.add_routes_bulk(
+            [
+                MessageRoute(predicate=lambda msg: True, handler=text_handler, message_types=frozenset({"text"})),
+                MessageRoute(predicate=lambda msg: True, handler=event_handler, event_types=frozenset({"notice"})),
+            ]
+        )
+
+        assert len(runtime._routes) == 2
+
+        msg = make_message("text")
+        await runtime.handle_message(msg)
+        text_handler.assert_called_once_with(msg)
+        event_handler.assert_not_called()
+
+        event_msg = make_message("image")
+        event_msg["event_type"] = "notice"
+        await runtime.handle_message(event_msg)
+        event_handler.assert_called_once_with(event_msg)
+
+        # 既不是 text 也没有事件类型的消息没有可匹配的路由
+        assert await runtime.handle_message(make_message("image")) is None
+        assert text_handler.call_count == 1
+        assert event_handler.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_routes_added_after_freeze_take_effect(self, runtime: MessageRuntime):
+        """测试 freeze 之后新增的路由在下一条消息即可匹配，重复 freeze 不影响结果"""
+        text_handler = AsyncMock(return_value=None)
+        runtime.add_route(lambda msg: True, text_handler, message_type="text")
+        runtime.freeze()
+        runtime.freeze()
+
+        text_msg = make_message("text")
+        await runtime.handle_message(text_msg)
+        text_handler.assert_called_once_with(text_msg)
+
+        fallback = AsyncMock(return_value=None)
+        runtime.add_route(lambda msg: True, fallback)
+
+        msg = make_message("image")
+        await runtime.handle_message(msg)
+        fallback.assert_called_once_with(msg)
+        assert text_handler.call_count == 1
 
 # ============================================================
 # 测试消息类型路由
@@ -269,6 +337,50 @@ class TestMessageTypeRouting:
         handler1.assert_called_once()
         handler2.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_route_by_event_type(self, runtime: MessageRuntime):
+        """测试按事件类型路由"""
+        handler = AsyncMock(return_value=None)
+        runtime.add_route(lambda msg: True, handler, event_types=["notice.poke"])
+
+        await runtime.handle_message(make_message())
+        handler.assert_not_called()
+
+        msg = make_message()
+        msg["message_info"]["additional_config"] = {"event_type": "notice.poke"}
+        await runtime.handle_message(msg)
+        handler.assert_called_once_with(msg)
+
+    @pytest.mark.asyncio
+    async def test_route_with_type_and_event_evaluated_once(self, runtime: MessageRuntime):
+        """测试同时声明类型与事件的路由只被评估和调用一次"""
+        predicate = MagicMock(return_value=True)
+        handler = AsyncMock(return_value=None)
+        runtime.add_route(predicate, handler, message_type="text", event_types=["notice.poke"])
+
+        msg = make_message("text")
+        msg["message_info"]["additional_config"] = {"event_type": "notice.poke"}
+        await runtime.handle_message(msg)
+
+        predicate.assert_called_once_with(msg)
+        handler.assert_called_once_with(msg)
+
+    def test_single_message_type_sets_are_shared(self, runtime: MessageRuntime):
+        """测试相同单一类型的路由共享同一个 frozenset"""
+        runtime.add_route(lambda msg: True, AsyncMock(), message_type="text")
+        runtime.add_route(lambda msg: True, AsyncMock(), message_type=["text"])
+        runtime.add_route(lambda msg: True, AsyncMock(), message_type=frozenset({"text", "image"}))
+
+        first, second, third = runtime._routes
+        assert first.message_types is second.message_types
+        assert first.message_types == frozenset({"text"})
+        assert third.message_types == {"text", "image"}
+
+    def test_invalid_message_type_raises(self, runtime: MessageRuntime):
+        """测试非法 message_type 参数类型"""
+        with pytest.raises(TypeError):
+            runtime.add_route(lambda msg: True, AsyncMock(), message_type=123)  # type: ignore[arg-type]
+
 
 # ============================================================
 # 测试装饰器
@@ -318,6 +430,196 @@ class TestDecorators:
         await runtime.handle_message(discord_msg)
         handler.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_on_message_without_predicate_is_static(self, runtime: MessageRuntime):
+        """测试没有自定义条件的 @on_message 路由走静态匹配"""
+        @runtime.on_message(message_type="text", platform="qq")
+        async def handler(msg):
+            return msg
+
+        route = runtime._routes[0]
+        assert route.is_static is True
+        assert route.platform == "qq"
+        assert route.message_types == {"text"}
+
+    @pytest.mark.asyncio
+    async def test_sync_handler_called_directly(self, runtime: MessageRuntime, monkeypatch):
+        """测试无中间件时同步处理器直接调用，不经过 _invoke_kind"""
+        invoked = []
+        original = runtime_module._invoke_kind
+
+        async def tracking_invoke(kind, func, *args):
+            invoked.append(func)
+            return await original(kind, func, *args)
+
+        monkeypatch.setattr(runtime_module, "_invoke_kind", tracking_invoke)
+
+        def handler(msg):
+            return msg
+
+        runtime.add_route(lambda msg: True, handler)
+        msg = make_message()
+        assert await runtime.handle_message(msg) is msg
+        assert handler not in invoked
+
+    @pytest.mark.asyncio
+    async def test_same_priority_handlers_isolate_context(self, runtime: MessageRuntime):
+        """测试同优先度的多个处理器各自在独立上下文中运行，跨挂起点的 ContextVar 令牌可正常重置"""
+        import contextvars
+
+        var: contextvars.ContextVar[str] = contextvars.ContextVar("test_var", default="unset")
+        seen = []
+
+        async def pure(msg):
+            return None
+
+        async def suspending(msg):
+            token = var.set("inner")
+            await asyncio.sleep(0)
+            seen.append(var.get())
+            var.reset(token)
+            return msg
+
+        runtime.add_route(lambda msg: True, pure)
+        runtime.add_route(lambda msg: True, suspending)
+
+        msg = make_message()
+        assert await runtime.handle_message(msg) is msg
+        assert seen == ["inner"]
+        assert var.get() == "unset"
+
+    @pytest.mark.asyncio
+    async def test_same_priority_handlers_support_task_scoped_timeouts(self, runtime: MessageRuntime):
+        """测试同优先度处理器与批量处理中使用 asyncio.timeout 只影响处理器自身"""
+        async def timed(msg):
+            try:
+                async with asyncio.timeout(0.01):
+                    await asyncio.sleep(1)
+            except TimeoutError:
+                return {"timed_out": True}
+
+        async def quiet(msg):
+            return None
+
+        runtime.add_route(lambda msg: True, timed)
+        runtime.add_route(lambda msg: True, quiet)
+
+        assert await runtime.handle_message(make_message()) == {"timed_out": True}
+        responses = await runtime.handle_batch([make_message(), make_message()])
+        assert responses == [{"timed_out": True}, {"timed_out": True}]
+
+    @pytest.mark.asyncio
+    async def test_static_routes_match_cache_behaviour(self, runtime: MessageRuntime):
+        """测试全静态路由的重复匹配结果正确，新增路由立即生效，动态路由的 predicate 每条消息都会调用"""
+        text_handler = AsyncMock(return_value=None)
+        qq_handler = AsyncMock(return_value=None)
+        runtime.on_message(text_handler, message_type="text")
+        runtime.on_message(qq_handler, message_type="text", platform="qq", priority=1)
+
+        for _ in range(3):
+            await runtime.handle_message(make_message("text", "discord"))
+        await runtime.handle_message(make_message("text", "qq"))
+        await runtime.handle_message(make_message("text", "qq"))
+        assert text_handler.call_count == 3
+        assert qq_handler.call_count == 2
+
+        # 已匹配过的组合在新增更高优先度的静态路由后改由新路由处理
+        override = AsyncMock(return_value=None)
+        runtime.on_message(override, message_type="text", priority=2)
+        await runtime.handle_message(make_message("text", "qq"))
+        override.assert_called_once()
+        assert qq_handler.call_count == 2
+
+        predicate = MagicMock(return_value=True)
+        dynamic_handler = AsyncMock(return_value=None)
+        runtime.add_route(predicate, dynamic_handler, priority=5)
+        await runtime.handle_message(make_message("text", "discord"))
+        await runtime.handle_message(make_message("text", "discord"))
+        assert predicate.call_count == 2
+        assert dynamic_handler.call_count == 2
+        assert text_handler.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_sync_predicate_returning_awaitable(self, runtime: MessageRuntime):
+        """测试同步 predicate 返回可等待对象时仍会被等待"""
+        async def check(msg):
+            return msg["message_segment"]["type"] == "image"
+
+        handler = AsyncMock(return_value=None)
+        runtime.add_route(lambda msg: check(msg), handler)
+
+        await runtime.handle_message(make_message("text"))
+        handler.assert_not_called()
+
+        await runtime.handle_message(make_message("image"))
+        handler.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_add_route_platform_checked_before_predicate(self, runtime: MessageRuntime):
+        """测试平台条件在 predicate 之前检查"""
+        predicate = MagicMock(return_value=True)
+        handler = AsyncMock(return_value=None)
+        runtime.add_route(predicate, handler, platform="qq")
+
+        await runtime.handle_message(make_message("text", "discord"))
+        predicate.assert_not_called()
+        handler.assert_not_called()
+
+        await runtime.handle_message(make_message("text", "qq"))
+        predicate.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_type_mismatch_never_calls_predicate(self, runtime: MessageRuntime):
+        """测试声明了消息类型的路由在类型不匹配时完全不调用 predicate"""
+        predicate = MagicMock(return_value=True)
+        handler = AsyncMock(return_value=None)
+        runtime.add_route(predicate, handler, message_type=["text", "image"])
+
+        await runtime.handle_message(make_message("voice"))
+        predicate.assert_not_called()
+
+        await runtime.handle_message(make_message("image"))
+        predicate.assert_called_once()
+        handler.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_event_route_type_checked_before_predicate(self, runtime: MessageRuntime):
+        """测试事件路由同时声明消息类型时，类型条件在 predicate 之前检查"""
+        predicate = MagicMock(return_value=True)
+        handler = AsyncMock(return_value=None)
+        runtime.add_route(predicate, handler, message_type="image", event_types=["notice"])
+
+        msg = make_message("text")
+        msg["event_type"] = "notice"
+        await runtime.handle_message(msg)
+        predicate.assert_not_called()
+        handler.assert_not_called()
+
+        msg = make_message("image")
+        msg["event_type"] = "notice"
+        await runtime.handle_message(msg)
+        predicate.assert_called_once()
+        handler.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_type_and_event_route_requires_both(self, runtime: MessageRuntime):
+        """测试同时声明消息类型和事件类型的路由，两个条件都满足才命中"""
+        handler = AsyncMock(return_value=None)
+        runtime.add_route(lambda m: True, handler, message_type="image", event_types=["notice"])
+
+        # 类型匹配但没有事件
+        await runtime.handle_message(make_message("image"))
+        # 类型匹配但事件不同
+        msg = make_message("image")
+        msg["event_type"] = "request"
+        await runtime.handle_message(msg)
+        handler.assert_not_called()
+
+        msg = make_message("image")
+        msg["event_type"] = "notice"
+        await runtime.handle_message(msg)
+        handler.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_on_message_without_args(self, runtime: MessageRuntime):
         """测试不带参数的 @on_message"""
@@ -397,6 +699,151 @@ class TestHooks:
         hook1.assert_called_once()
         hook2.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_sync_hooks_run_inline_in_order(self, runtime: MessageRuntime):
+        """测试同步钩子按注册顺序在事件循环线程内执行"""
+        import threading
+
+        calls = []
+        loop_thread = threading.get_ident()
+
+        def hook1(msg):
+            calls.append(("hook1", threading.get_ident()))
+
+        def hook2(msg):
+            calls.append(("hook2", threading.get_ident()))
+
+        runtime.register_before_hook(hook1)
+        runtime.register_before_hook(hook2)
+        runtime.add_route(lambda msg: True, AsyncMock())
+
+        await runtime.handle_message(make_message())
+
+        assert calls == [("hook1", loop_thread), ("hook2", loop_thread)]
+
+    @pytest.mark.asyncio
+    async def test_blocking_handler_runs_in_thread(self, runtime: MessageRuntime):
+        """测试 blocking=True 的同步处理器放到线程池执行，默认在事件循环内执行"""
+        import threading
+
+        threads = {}
+        loop_thread = threading.get_ident()
+
+        def inline_handler(msg):
+            threads["inline"] = threading.get_ident()
+
+        def blocking_handler(msg):
+            threads["blocking"] = threading.get_ident()
+
+        runtime.add_route(lambda msg: True, inline_handler, message_type="text")
+        runtime.add_route(lambda msg: True, blocking_handler, message_type="image", blocking=True)
+
+        await runtime.handle_message(make_message("text"))
+        await runtime.handle_message(make_message("image"))
+
+        assert threads["inline"] == loop_thread
+        assert threads["blocking"] != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_before_hooks_run_concurrently(self, runtime: MessageRuntime):
+        """测试单个钩子每条消息只调用一次，多个异步钩子并发执行"""
+        started = []
+        release = asyncio.Event()
+
+        async def hook(msg):
+            started.append(msg)
+            await release.wait()
+
+        runtime.add_route(lambda msg: True, AsyncMock())
+        # 无钩子时直接处理
+        await runtime.handle_message(make_message())
+
+        runtime.register_before_hook(hook)
+        task = asyncio.create_task(runtime.handle_message(make_message()))
+        await asyncio.sleep(0.01)
+        assert len(started) == 1
+        release.set()
+        await task
+
+        started.clear()
+        release.clear()
+        runtime.register_before_hook(hook)
+        task = asyncio.create_task(runtime.handle_message(make_message()))
+        await asyncio.sleep(0.01)
+        # 第二个钩子在第一个完成之前已经开始
+        assert len(started) == 2
+        release.set()
+        await task
+
+    @pytest.mark.asyncio
+    async def test_fire_and_forget_after_hook(self, runtime: MessageRuntime, caplog):
+        """测试 fire_and_forget 后置钩子由常驻工作任务执行，不阻塞处理，异常只记录日志"""
+        release = asyncio.Event()
+        seen = []
+
+        async def slow_hook(msg):
+            await release.wait()
+            seen.append(msg)
+
+        def failing_hook(msg):
+            raise RuntimeError("boom")
+
+        runtime.register_after_hook(slow_hook, fire_and_forget=True)
+        runtime.register_after_hook(failing_hook, fire_and_forget=True)
+        assert runtime._run_after_hooks is None
+        runtime.add_route(lambda msg: True, AsyncMock(return_value=None))
+
+        first, second = make_message(), make_message()
+        await runtime.handle_message(first)
+        await runtime.handle_message(second)
+        worker = runtime._after_hook_worker
+        assert worker is not None
+        assert seen == []
+
+        release.set()
+        await runtime.flush_after_hooks()
+        assert seen == [first, second]
+        assert runtime._after_hook_worker is worker
+        assert "后台后置钩子执行失败" in caplog.text
+
+        await runtime.close()
+        assert worker.done()
+        assert runtime._after_hook_worker is None
+
+    @pytest.mark.asyncio
+    async def test_multiple_hooks_support_task_scoped_timeouts(self, runtime: MessageRuntime):
+        """测试多个异步钩子中使用 asyncio.timeout 只影响钩子自身，不会取消整个分发"""
+        calls = []
+
+        async def timed(msg):
+            try:
+                async with asyncio.timeout(0.01):
+                    await asyncio.sleep(1)
+            except TimeoutError:
+                calls.append("timed_out")
+
+        async def quick(msg):
+            calls.append("quick")
+
+        runtime.register_before_hook(timed)
+        runtime.register_before_hook(quick)
+        runtime.add_route(lambda msg: True, AsyncMock(return_value={"ok": 1}))
+
+        assert await runtime.handle_message(make_message()) == {"ok": 1}
+        assert sorted(calls) == ["quick", "timed_out"]
+
+    @pytest.mark.asyncio
+    async def test_multiple_hooks_propagate_exception(self, runtime: MessageRuntime):
+        """测试多个钩子中的异常照常抛出"""
+        async def failing(msg):
+            raise ValueError("boom")
+
+        runtime.register_after_hook(failing)
+        runtime.register_after_hook(AsyncMock())
+        runtime.add_route(lambda msg: True, AsyncMock(return_value=None))
+
+        with pytest.raises(ValueError):
+            await runtime.handle_message(make_message())
 
 # ============================================================
 # 测试中间件
@@ -432,6 +879,32 @@ class TestMiddleware:
         
         assert call_order == ["before_middleware", "handler", "after_middleware"]
 
+    @pytest.mark.asyncio
+    async def test_async_chain_passes_handler_directly(self, runtime: MessageRuntime):
+        """测试异步处理器作为 next 直接传给中间件，不额外包装"""
+        seen_next = []
+
+        async def middleware(msg, handler):
+            seen_next.append(handler)
+            return await handler(msg)
+
+        async def handler(msg):
+            return msg
+
+        def sync_middleware(msg, handler):
+            return handler(msg)
+
+        runtime.register_middleware(middleware)
+        runtime.add_route(lambda msg: True, handler)
+
+        msg = make_message()
+        assert await runtime.handle_message(msg) is msg
+        assert seen_next == [handler]
+
+        # 同步中间件返回的协程同样会被等待
+        runtime.register_middleware(sync_middleware)
+        assert await runtime.handle_message(msg) is msg
+
     @pytest.mark.asyncio
     async def test_multiple_middlewares(self, runtime: MessageRuntime):
         """测试多个中间件（洋葱模型）"""
@@ -463,6 +936,16 @@ class TestMiddleware:
         # 洋葱模型：m1 -> m2 -> handler -> m2 -> m1
         assert call_order == ["m1_before", "m2_before", "handler", "m2_after", "m1_after"]
 
+        # 分发之后再注册的中间件同样位于最内层
+        async def middleware3(msg, handler):
+            call_order.append("m3")
+            return await handler(msg)
+
+        runtime.register_middleware(middleware3)
+        call_order.clear()
+        await runtime.handle_message(make_message())
+        assert call_order == ["m1_before", "m2_before", "m3", "handler", "m2_after", "m1_after"]
+
     @pytest.mark.asyncio
     async def test_middleware_can_modify_message(self, runtime: MessageRuntime):
         """测试中间件可以修改消息"""
@@ -486,6 +969,155 @@ class TestMiddleware:
         
         assert received_msg["metadata"]["modified"] is True
 
+    @pytest.mark.asyncio
+    async def test_middleware_copy_on_write(self, runtime: MessageRuntime):
+        """测试 copy_on_write 视图：写入不影响原信封，读取落到原信封"""
+        async def middleware(msg, handler):
+            view = copy_on_write(msg)
+            view["metadata"] = {"modified": True}
+            return await handler(view)
+
+        received = []
+
+        async def handler(msg):
+            received.append(msg)
+            return msg
+
+        runtime.register_middleware(middleware)
+        runtime.add_route(lambda msg: True, handler)
+
+        msg = make_message()
+        await runtime.handle_message(msg)
+
+        view = received[0]
+        assert view["metadata"] == {"modified": True}
+        assert view["message_segment"] is msg["message_segment"]
+        assert "metadata" not in msg
+        assert dict(view)["message_info"] == msg["message_info"]
+
+    @pytest.mark.asyncio
+    async def test_middleware_registered_after_dispatch(self, runtime: MessageRuntime):
+        """测试分发后注册的中间件会使缓存的处理器链失效"""
+        call_order = []
+
+        async def middleware(msg, handler):
+            call_order.append("middleware")
+            return await handler(msg)
+
+        async def handler(msg):
+            call_order.append("handler")
+            return msg
+
+        runtime.add_route(lambda msg: True, handler)
+
+        await runtime.handle_message(make_message())
+        assert call_order == ["handler"]
+
+        call_order.clear()
+        runtime.register_middleware(middleware)
+        await runtime.handle_message(make_message())
+        assert call_order == ["middleware", "handler"]
+
+
+# ============================================================
+# 测试匹配上下文
+# ============================================================
+
+class TestMatchContext:
+    """测试匹配上下文"""
+
+    @pytest.mark.asyncio
+    async def test_ctx_for_reuses_dispatch_context(self):
+        """测试分发期间 ctx_for 复用同一个上下文对象"""
+        runtime = MessageRuntime()
+        seen: list[MatchContext] = []
+
+        async def handler(msg):
+            seen.append(ctx_for(msg))
+
+        def after_hook(msg):
+            seen.append(ctx_for(msg))
+
+        runtime.register_after_hook(after_hook)
+        runtime.add_route(lambda msg: True, handler)
+
+        msg = make_message("image", "qq")
+        await runtime.handle_message(msg)
+
+        assert len(seen) == 2
+        assert seen[0] is seen[1]
+        assert seen[0].seg_type == "image"
+        assert seen[0].platform == "qq"
+        assert seen[0].event_type is None
+
+    @pytest.mark.asyncio
+    async def test_before_hook_mutation_affects_routing(self):
+        """测试前置钩子原地修改信封后，路由按修改后的内容匹配"""
+        runtime = MessageRuntime()
+
+        def before_hook(msg):
+            msg["message_segment"] = {"type": "text", "data": "converted"}
+
+        @runtime.on_message(message_type="text")
+        async def handler(msg):
+            return {"ok": 1}
+
+        runtime.register_before_hook(before_hook)
+        assert await runtime.handle_message(make_message("raw")) == {"ok": 1}
+
+    def test_match_context_segment_type_shapes(self):
+        """测试上下文提取覆盖字典段、空字典段回退到 message_chain 以及列表段"""
+        assert ctx_for(make_message("image")).seg_type == "image"
+        assert ctx_for({"message_segment": {}, "message_chain": [{"type": "voice"}]}).seg_type == "voice"  # type: ignore[typeddict-item]
+        assert ctx_for({"message_segment": [{"type": "text"}]}).seg_type == "text"  # type: ignore[typeddict-item]
+        assert ctx_for({}).seg_type is None  # type: ignore[typeddict-item]
+
+    def test_ctx_for_outside_dispatch(self):
+        """测试分发之外调用 ctx_for 会重新提取"""
+        msg = make_message("text", "discord")
+        ctx = ctx_for(msg)
+        assert ctx.message is msg
+        assert ctx.seg_type == "text"
+        assert ctx.platform == "discord"
+
+
+    @pytest.mark.asyncio
+    async def test_redispatch_after_in_place_change(self):
+        """测试处理器原地修改信封后再次分发，按修改后的内容重新匹配"""
+        runtime = MessageRuntime()
+        image_calls = []
+
+        @runtime.on_message(message_type="text")
+        async def text_handler(msg):
+            msg["message_segment"] = {"type": "image", "data": "converted"}
+            return await runtime.handle_message(msg)
+
+        @runtime.on_message(message_type="image")
+        async def image_handler(msg):
+            image_calls.append(msg)
+            return {"routed": "image"}
+
+        msg = make_message("text")
+        assert await runtime.handle_message(msg) == {"routed": "image"}
+        assert image_calls == [msg]
+
+    @pytest.mark.asyncio
+    async def test_nested_match_sees_in_place_change(self):
+        """测试在处理器中原地修改信封后调用 _match_route 使用最新内容"""
+        runtime = MessageRuntime()
+        matched = []
+
+        @runtime.on_message(message_type="image", name="image")
+        async def image_handler(msg):
+            return None
+
+        @runtime.on_message(message_type="text", name="text")
+        async def text_handler(msg):
+            msg["message_segment"] = {"type": "image", "data": "converted"}
+            matched.append(await runtime._match_route(msg))
+
+        await runtime.handle_message(make_message("text"))
+        assert matched[0].name == "image"
 
 # ============================================================
 # 测试批量处理
@@ -515,6 +1147,34 @@ class TestBatchProcessing:
         assert len(processed) == 3
         assert len(responses) == 3
 
+    @pytest.mark.asyncio
+    async def test_handle_batch_concurrent_preserves_order(self, runtime: MessageRuntime):
+        """测试默认并发处理，响应顺序与输入一致；concurrent=False 时逐条处理"""
+        active = 0
+        peak = 0
+
+        async def handler(msg):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01 if msg["message_info"]["message_id"] == "0" else 0)
+            active -= 1
+            return msg
+
+        runtime.add_route(lambda msg: True, handler)
+        messages = [make_message() for _ in range(3)]
+        for index, msg in enumerate(messages):
+            msg["message_info"]["message_id"] = str(index)
+
+        responses = await runtime.handle_batch(messages)
+        assert responses == messages
+        assert peak == 3
+
+        peak = 0
+        responses = await runtime.handle_batch(messages, concurrent=False)
+        assert responses == messages
+        assert peak == 1
+
     @pytest.mark.asyncio
     async def test_handle_batch_custom_handler(self, runtime: MessageRuntime):
         """测试自定义批量处理器"""
@@ -528,6 +1188,24 @@ class TestBatchProcessing:
         
         assert len(responses) == 3
 
+    @pytest.mark.asyncio
+    async def test_handle_batch_reuses_list(self, runtime: MessageRuntime):
+        """测试传入列表时批量处理器直接收到同一个列表"""
+        received = []
+
+        async def batch_handler(messages: List[MessageEnvelope]):
+            received.append(messages)
+            return messages
+
+        runtime.set_batch_handler(batch_handler)
+
+        messages = [make_message() for _ in range(3)]
+        await runtime.handle_batch(messages)
+        assert received[0] is messages
+
+        await runtime.handle_batch(iter(messages))
+        assert received[1] == messages
+
     @pytest.mark.asyncio
     async def test_handle_batch_empty(self, runtime: MessageRuntime):
         """测试处理空批次"""
@@ -582,6 +1260,43 @@ class TestErrorHandling:
 class TestHelperFunctions:
     """测试辅助函数"""
 
+    @pytest.mark.asyncio
+    async def test_callable_instance_predicates(self):
+        """测试可调用实例作为 predicate 时每条消息都按其 __call__ 结果匹配"""
+        class TextOnly:
+            def __init__(self):
+                self.calls = 0
+
+            def __call__(self, msg):
+                self.calls += 1
+                return msg["message_segment"]["type"] == "text"
+
+        runtime = MessageRuntime()
+        predicate = TextOnly()
+        handler = AsyncMock(return_value=None)
+        runtime.add_route(predicate, handler)
+
+        await runtime.handle_message(make_message("text"))
+        await runtime.handle_message(make_message("image"))
+        await runtime.handle_message(make_message("text"))
+
+        assert predicate.calls == 3
+        assert handler.call_count == 2
+
+    def test_filter_sets_are_interned(self):
+        """测试内容相同的消息类型/事件类型集合在路由之间共享同一个对象"""
+        runtime = MessageRuntime()
+        runtime.add_route(lambda msg: True, AsyncMock(), message_type=["text", "image"], event_types=["a", "b"])
+        runtime.add_route(lambda msg: True, AsyncMock(), message_type=frozenset({"image", "text"}), event_types={"b", "a"})
+        runtime.add_route(lambda msg: True, AsyncMock(), message_type=["voice"], event_types=["a"])
+        runtime.add_route(lambda msg: True, AsyncMock(), message_type="voice")
+
+        first, second, third, fourth = runtime._routes
+        assert first.message_types is second.message_types
+        assert first.event_types is second.event_types
+        assert third.message_types is fourth.message_types
+        assert third.event_types == frozenset({"a"})
+
     def test_extract_segment_type_from_dict(self):
         """测试从字典提取段类型"""
         msg = make_message("text")
@@ -618,6 +1333,19 @@ class TestHelperFunctions:
         }
         assert _extract_segment_type(msg) is None
 
+    def test_extract_event_type(self):
+        """测试事件类型提取：顶层优先，其次 additional_config"""
+        msg = make_message()
+        assert _extract_event_type(msg) is None
+
+        msg["message_info"]["additional_config"] = {"event_type": "notice.poke"}
+        assert _extract_event_type(msg) == "notice.poke"
+
+        msg["event_type"] = "message.receive"  # type: ignore[typeddict-unknown-key]
+        assert _extract_event_type(msg) == "message.receive"
+
+        assert _extract_event_type({"message_info": None}) is None  # type: ignore[typeddict-item]
+
     def test_looks_like_method_function(self):
         """测试普通函数不是方法"""
         def func(msg):
@@ -634,6 +1362,33 @@ class TestHelperFunctions:
         """测试 lambda 不是方法"""
         assert _looks_like_method(lambda msg: msg) is False
 
+    def test_looks_like_method_cached(self, monkeypatch):
+        """测试同一函数对象的判断结果被缓存，不再重复解析代码对象"""
+        def method(self, msg):
+            pass
+
+        assert _looks_like_method(method) is True
+        monkeypatch.setattr(runtime_module.inspect, "unwrap", MagicMock(side_effect=AssertionError))
+        assert _looks_like_method(method) is True
+
+    def test_classify_callable(self):
+        """测试注册时的调用方式分类"""
+        async def async_func(msg):
+            return msg
+
+        def sync_func(msg):
+            return msg
+
+        class AsyncCallable:
+            async def __call__(self, msg):
+                return msg
+
+        assert _classify_callable(async_func) == _CALL_ASYNC
+        assert _classify_callable(AsyncCallable()) == _CALL_ASYNC
+        assert _classify_callable(AsyncMock()) == _CALL_ASYNC
+        assert _classify_callable(sync_func) == _CALL_SYNC
+        assert _classify_callable(lambda msg: True) == _CALL_SYNC
+
 
 # ============================================================
 # 测试实例方法路由
@@ -642,6 +1397,77 @@ class TestHelperFunctions:
 class TestInstanceMethodRouting:
     """测试实例方法路由"""
 
+    @pytest.mark.asyncio
+    async def test_bind_and_unbind_instance(self):
+        """测试 unbind 移除实例路由，bind 重新注册且处理器已预先绑定到实例"""
+        runtime = MessageRuntime()
+        received = []
+
+        class Handler:
+            @runtime.on_message(message_type="text")
+            async def handle_text(self, msg):
+                received.append(self)
+                return msg
+
+        handler = Handler()
+        assert runtime._routes[0].handler.__self__ is handler
+
+        assert runtime.unbind(handler) == 1
+        assert runtime.unbind(handler) == 0
+        assert runtime._routes == []
+        await runtime.handle_message(make_message("text"))
+        assert received == []
+
+        routes = runtime.bind(handler)
+        assert len(routes) == 1
+        assert runtime.bind(handler) == []
+        await runtime.handle_message(make_message("text"))
+        assert received == [handler]
+
+    @pytest.mark.asyncio
+    async def test_attribute_access_after_unbind_does_not_register(self):
+        """测试 unbind 之后访问方法属性不会重新注册路由"""
+        runtime = MessageRuntime()
+        received = []
+
+        class Handler:
+            @runtime.on_message(message_type="text")
+            async def handle_text(self, msg):
+                received.append(msg)
+                return msg
+
+        handler = Handler()
+        runtime.unbind(handler)
+        await handler.handle_text(make_message("text"))
+        received.clear()
+
+        await runtime.handle_message(make_message("text"))
+        assert received == []
+
+        runtime.bind(handler)
+        await runtime.handle_message(make_message("text"))
+        assert len(received) == 1
+
+    @pytest.mark.asyncio
+    async def test_bind_instance_created_without_init(self):
+        """测试绕过 __init__ 创建的实例可以通过 bind 显式注册"""
+        runtime = MessageRuntime()
+        received = []
+
+        class Handler:
+            @runtime.on_message(message_type="text")
+            async def handle_text(self, msg):
+                received.append(msg)
+                return msg
+
+        handler = Handler.__new__(Handler)
+        assert runtime._routes == []
+        runtime.bind(handler)
+
+        msg = make_message("text")
+        await runtime.handle_message(msg)
+        assert received == [msg]
+
     @pytest.mark.asyncio
     async def test_instance_method_route(self):
         """测试实例方法作为路由处理器"""
@@ -689,6 +1515,80 @@ class TestInstanceMethodRouting:
         # 至少有一个处理器收到消息
         assert len(received1) + len(received2) >= 1
 
+    @pytest.mark.asyncio
+    async def test_unhashable_instance_route(self):
+        """测试定义了 __eq__ 而不可哈希的类也能注册实例方法路由"""
+        runtime = MessageRuntime()
+        received = []
+
+        class Handler:
+            def __eq__(self, other):
+                return isinstance(other, Handler)
+
+            @runtime.on_message(message_type="text")
+            async def handle_text(self, msg):
+                received.append(msg)
+
+        handler = Handler()
+        handler.handle_text  # 再次访问不会重复注册
+        assert len(runtime._routes) == 1
+
+        msg = make_message("text")
+        await runtime.handle_message(msg)
+        assert received == [msg]
+
+    @pytest.mark.asyncio
+    async def test_instance_routes_registered_in_bulk(self):
+        """测试实例构造时所有方法路由通过一次批量注册完成"""
+        runtime = MessageRuntime()
+        calls = []
+        original = runtime.add_routes_bulk
+
+        def spy(routes):
+            routes = list(routes)
+            calls.append(len(routes))
+            original(routes)
+
+        runtime.add_routes_bulk = spy  # type: ignore[method-assign]
+
+        class Handler:
+            @runtime.on_message(message_type="text")
+            async def handle_text(self, msg):
+                pass
+
+            @runtime.on_message(message_type="image")
+            async def handle_image(self, msg):
+                pass
+
+        Handler()
+        assert calls == [2]
+        assert len(runtime._routes) == 2
+
+    @pytest.mark.asyncio
+    async def test_subclass_routes_registered_per_class(self):
+        """测试子类声明的路由不会注册到父类实例上"""
+        runtime = MessageRuntime()
+        received = []
+
+        class Base:
+            @runtime.on_message(message_type="text")
+            async def handle_text(self, msg):
+                received.append(("text", type(self).__name__))
+
+        class Child(Base):
+            @runtime.on_message(message_type="image")
+            async def handle_image(self, msg):
+                received.append(("image", type(self).__name__))
+
+        Base()
+        assert len(runtime._routes) == 1
+
+        Child()
+        assert len(runtime._routes) == 3
+
+        await runtime.handle_message(make_message("image"))
+        assert received == [("image", "Child")]
+
 
 # ============================================================
 # 测试优先度功能
@@ -736,6 +1636,22 @@ class TestRoutePriority:
         assert runtime._routes[2].priority == 1
         assert runtime._routes[2].name == "low"
 
+    @pytest.mark.asyncio
+    async def test_type_bucket_sorted_and_short_circuits(self):
+        """测试类型桶按优先度排序，更高优先度匹配后不再评估低优先度的 predicate"""
+        runtime = MessageRuntime()
+        low_predicate = MagicMock(return_value=True)
+        high_handler = AsyncMock(return_value=None)
+
+        runtime.add_route(low_predicate, AsyncMock(), name="low", message_type="text", priority=1)
+        runtime.add_route(lambda msg: True, high_handler, name="high", message_type="text", priority=10)
+
+        msg = make_message("text")
+        await runtime.handle_message(msg)
+
+        high_handler.assert_called_once_with(msg)
+        low_predicate.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_only_highest_priority_handler_called(self):
         """测试只有最高优先度的处理器被调用"""